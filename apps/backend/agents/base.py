@@ -10,7 +10,7 @@ from apps.backend.infra.clock import UtcClock
 from apps.backend.infra.tracing import TraceRecorder
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class AgentContext:
     """Agent 执行上下文，封装任务元数据与追踪记录器。"""
 
@@ -21,7 +21,7 @@ class AgentContext:
     parent_span_id: Optional[str] = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class AgentOutcome:
     """Agent 执行结果包装，携带输出与 Span 记录。"""
 
@@ -3,9 +3,10 @@
 from __future__ import annotations
 
 import logging
+import secrets
 from dataclasses import dataclass
+from operator import attrgetter
 from typing import List
-from uuid import uuid4
 
 from apps.backend.agents.base import Agent, AgentContext, AgentOutcome
 from apps.backend.contracts.chart_spec import ChartA11y, ChartLayout, ChartSpec
@@ -14,8 +15,16 @@ from apps.backend.contracts.trace import SpanSLO
 
 LOGGER = logging.getLogger(__name__)
 
+_CONFIDENCE_KEY = attrgetter("confidence")
+"""候选置信度取值函数，C 实现的 attrgetter 比 lambda 省去逐项 Python 帧开销。"""
 
-@dataclass(frozen=True)
+_EMPTY_CANDIDATES_MSG = "缺少候选模板，无法生成图表。"
+
+_DEFAULT_LAYOUT = ChartLayout(width=720, height=480, padding=24, theme="default")
+"""默认画布布局，ChartLayout 不可变，模块加载时构造一次后由所有图表共享。"""
+
+
+@dataclass(frozen=True, slots=True)
 class ChartPayload:
     """图表生成所需输入。"""
 
@@ -24,10 +33,13 @@ class ChartPayload:
 
 
 def _select_candidate(candidates: List[ChartPlanItem]) -> ChartPlanItem:
-    """按置信度排序，选择最优候选。"""
+    """选择置信度最高的候选，同分时保留计划中的先后顺序。"""
 
-    sorted_candidates = sorted(candidates, key=lambda candidate: candidate.confidence, reverse=True)
-    return sorted_candidates[0]
+    # 显式守卫空列表，给出明确错误而非 max() 的通用异常。
+    if not candidates:
+        raise ValueError(_EMPTY_CANDIDATES_MSG)
+    # 仅需首选项，max 单次线性扫描即可，无需排序整个列表。
+    return max(candidates, key=_CONFIDENCE_KEY)
 
 
 class ChartRecommendationAgent(Agent):
@@ -43,6 +55,8 @@ class ChartRecommendationAgent(Agent):
     def run(self, context: AgentContext, payload: ChartPayload) -> AgentOutcome:
         """生成单个 ChartSpec。"""
 
+        # 先完成候选守卫，空计划时直接失败，不会留下未结束的 Span。
+        candidate = _select_candidate(candidates=payload.plan.chart_plan)
         span_id = context.trace_recorder.start_span(
             operation="chart.recommend",
             agent_name=self.name,
@@ -51,9 +65,9 @@ class ChartRecommendationAgent(Agent):
             model_name=None,
             prompt_version=None,
         )
-        candidate = _select_candidate(candidates=payload.plan.chart_plan)
+        # chart_id 仅作不透明标识，token_hex 省去 UUID 对象构造与格式化。
         chart_spec = ChartSpec(
-            chart_id=str(uuid4()),
+            chart_id=secrets.token_hex(16),
             template_id=candidate.template_id,
             engine=candidate.engine,
             encoding=candidate.encoding,
@@ -61,7 +75,7 @@ class ChartRecommendationAgent(Agent):
             scales=[],
             legends=[],
             axes=[],
-            layout=ChartLayout(width=720, height=480, padding=24, theme="default"),
+            layout=_DEFAULT_LAYOUT,
             a11y=ChartA11y(
                 title=f"{payload.plan.refined_goal} 图表",
                 summary="结合推荐字段自动生成的首图方案",
@@ -79,13 +93,15 @@ class ChartRecommendationAgent(Agent):
                 "engine": candidate.engine,
             },
         )
-        LOGGER.info(
-            "图表推荐完成",
-            extra={
-                "task_id": context.task_id,
-                "template_id": candidate.template_id,
-            },
-        )
+        # INFO 未启用时跳过 extra 字典构造，避免无效分配。
+        if LOGGER.isEnabledFor(logging.INFO):
+            LOGGER.info(
+                "图表推荐完成",
+                extra={
+                    "task_id": context.task_id,
+                    "template_id": candidate.template_id,
+                },
+            )
         return AgentOutcome(
             output=chart_spec,
             span_id=span_id,
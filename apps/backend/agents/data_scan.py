@@ -4,34 +4,47 @@ from __future__ import annotations
 
 import hashlib
 import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from math import log
+from math import nan
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Tuple
 
 from apps.backend.agents.base import Agent, AgentContext, AgentOutcome
 from apps.backend.contracts.dataset_profile import DatasetProfile, DatasetSampling, DatasetSummary
 from apps.backend.contracts.fields import FieldSchema, FieldStatistics, TemporalGranularity, ValueRange
 from apps.backend.contracts.metadata import SCHEMA_VERSION
 from apps.backend.contracts.trace import SpanSLO
+from apps.backend.infra.dataframe import get_numpy, get_pandas, render_sample_rows
 
-_PD_MODULE: Optional[Any] = None
+LOGGER = logging.getLogger(__name__)
 
+_TEMPORAL_NAME_KEYWORDS: Tuple[str, ...] = ("date", "time", "at")
+"""字段名包含这些片段时视为时间语义。"""
 
-def _get_pandas() -> Any:
-    """延迟加载 pandas，避免在不支持环境中提前导入。"""
+_NUMERIC_DATA_TYPES: frozenset[str] = frozenset({"integer", "number"})
+"""数值型基础类型集合，模块级 frozenset 避免每次调用重建集合。"""
 
-    global _PD_MODULE
-    if _PD_MODULE is None:
-        import pandas as pd  # noqa: WPS433 - 延迟导入
+# 按最小时间间隔分档的粒度候选，模块级元组在所有调用间共享。
+_SINGLE_DAY_GRANULARITIES: Tuple[TemporalGranularity, ...] = ("day",)
+_MINUTE_GRANULARITIES: Tuple[TemporalGranularity, ...] = ("minute", "hour", "day")
+_HOUR_GRANULARITIES: Tuple[TemporalGranularity, ...] = ("hour", "day", "week")
+_DAY_GRANULARITIES: Tuple[TemporalGranularity, ...] = ("day", "week", "month")
+_COARSE_GRANULARITIES: Tuple[TemporalGranularity, ...] = ("week", "month", "quarter", "year")
 
-        _PD_MODULE = pd
-    return _PD_MODULE
+_SCAN_CACHE_MAXSIZE = 32
+"""扫描结果缓存容量，按 (路径, mtime, 大小, 采样数) 区分文件版本。"""
 
-LOGGER = logging.getLogger(__name__)
+_PARALLEL_COLUMN_THRESHOLD = 8
+"""列数达到该值才用线程池计算字段画像；窄表的线程启动开销高于逐列计算本身。"""
+
+_SCAN_CACHE_LOCK = threading.Lock()
+"""保护扫描结果缓存，扫描可能在多个线程池线程中并发执行。"""
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ScanPayload:
     """数据扫描所需的输入参数。"""
 
@@ -42,10 +55,25 @@ class ScanPayload:
     sample_limit: int
 
 
+@dataclass(frozen=True, slots=True)
+class _ScanResult:
+    """与数据集标识无关的扫描结果，可在同一文件版本的多次扫描间复用。"""
+
+    hash_digest: str
+    row_count: int
+    field_schemas: Tuple[FieldSchema, ...]
+    sample_rows: Tuple[Dict[str, str], ...]
+    warnings: Tuple[str, ...]
+
+
+_SCAN_CACHE: Dict[Tuple[str, int, int, int], _ScanResult] = {}
+"""扫描结果缓存，字典保持插入顺序，命中时移到末尾，超出容量时淘汰最久未用的条目。"""
+
+
 def _infer_data_type(series: Any) -> str:
     """根据 Pandas dtype 推断基础数据类型。"""
 
-    pd = _get_pandas()
+    pd = get_pandas()
     dtype = series.dtype
     if pd.api.types.is_integer_dtype(dtype):
         return "integer"
@@ -62,86 +90,79 @@ def _infer_semantic_type(column_name: str, data_type: str) -> str:
     """根据字段名与基础类型推断语义类型。"""
 
     lowered = column_name.lower()
-    if any(keyword in lowered for keyword in {"date", "time", "at"}):
+    if any(keyword in lowered for keyword in _TEMPORAL_NAME_KEYWORDS):
         return "temporal"
-    if data_type in {"integer", "number"}:
+    if data_type in _NUMERIC_DATA_TYPES:
         return "measure"
     if "id" in lowered:
         return "identifier"
     return "dimension"
 
 
-def _build_value_range(series: Any, data_type: str) -> ValueRange | None:
-    """根据字段类型构建值域描述。"""
+def _build_value_range(non_null: Any, value_counts: Any, data_type: str) -> ValueRange | None:
+    """根据字段类型构建值域描述，复用调用方已计算的非空值与频次。"""
 
-    if data_type in {"integer", "number"}:
-        minimum = float(series.min())
-        maximum = float(series.max())
-        return ValueRange(minimum=minimum, maximum=maximum)
-    non_null = series.dropna()
+    if data_type in _NUMERIC_DATA_TYPES:
+        values = non_null.to_numpy()
+        if values.size == 0:
+            # 全空数值列沿用 pandas 的约定，以 NaN 表示值域。
+            return ValueRange(minimum=nan, maximum=nan)
+        # 非空值已去除 NaN，直接在底层数组上归约，省去 pandas 的缺失值掩码处理。
+        np = get_numpy()
+        return ValueRange(minimum=float(np.min(values)), maximum=float(np.max(values)))
     if non_null.empty:
         return None
-    value_counts = non_null.value_counts()
-    top_values = list(value_counts.index[:10])
-    top_counts = list(value_counts.values[:10])
-    categories = [str(item) for item in top_values]
-    frequencies = [int(value) for value in top_counts]
+    # 与 value_counts() 内部步骤相同：未排序频次表再按降序排序，并列频次的先后与基线一致。
+    top_counts = value_counts.sort_values(ascending=False).head(10)
+    categories = top_counts.index.astype(str).tolist()
+    frequencies = top_counts.astype(int).tolist()
     return ValueRange(categories=categories, top_k_frequencies=frequencies)
 
 
-def _calculate_entropy(series: Any) -> float | None:
-    """计算离散分布的信息熵。"""
+def _calculate_entropy(value_counts: Any) -> float | None:
+    """根据频次分布计算离散分布的信息熵。"""
 
-    non_null = series.dropna()
-    if non_null.empty:
+    if value_counts.empty:
         return None
-    probabilities = non_null.value_counts(normalize=True)
-    entropy = 0.0
-    for probability in probabilities:
-        entropy -= probability * log(probability, 2)
-    return entropy
+    np = get_numpy()
+    counts = value_counts.to_numpy()
+    probabilities = counts / counts.sum()
+    # 向量化求和，避免高基数字段逐个概率在解释器中累加；以 log2(1/p) 代替取负，单值列得到 0.0 而非 -0.0。
+    return float((probabilities * np.log2(1.0 / probabilities)).sum())
 
 
-def _recommend_temporal_granularities(series: Any) -> List[TemporalGranularity]:
-    """根据时间字段的频率推断合适的粒度候选。"""
+def _recommend_temporal_granularities(non_null: Any) -> List[TemporalGranularity]:
+    """根据时间字段非空值的频率推断合适的粒度候选。"""
 
-    pd = _get_pandas()
-    non_null = series.dropna()
+    pd = get_pandas()
     if non_null.empty:
-        return ["day"]
+        return list(_SINGLE_DAY_GRANULARITIES)
     if not hasattr(pd, "to_datetime"):
-        return ["day", "week", "month"]
-    try:
-        converted = pd.to_datetime(non_null)
-    except Exception as error:  # noqa: BLE001 - 保持 fail fast，抛出显式错误
-        message = "时间字段解析失败，无法推断时间粒度。"
-        raise ValueError(message) from error
+        return list(_DAY_GRANULARITIES)
+    if pd.api.types.is_datetime64_any_dtype(non_null.dtype):
+        # _build_field_schema 已完成解析时直接复用，避免再次整列解析。
+        converted = non_null
+    else:
+        try:
+            converted = pd.to_datetime(non_null)
+        except Exception as error:  # noqa: BLE001 - 保持 fail fast，抛出显式错误
+            message = "时间字段解析失败，无法推断时间粒度。"
+            raise ValueError(message) from error
     if not hasattr(non_null, "sort_values") or not hasattr(non_null, "diff"):
-        return ["day", "week", "month"]
+        return list(_DAY_GRANULARITIES)
     sorted_values = converted.sort_values()
     diffs = sorted_values.diff().dropna()
     if diffs.empty:
-        return ["day"]
+        return list(_SINGLE_DAY_GRANULARITIES)
     min_diff = diffs.min()
-    candidates: List[TemporalGranularity] = []
+    # 各档候选均为无重复的常量元组，直接复制即可，无需再去重。
     if min_diff <= pd.Timedelta(minutes=1):
-        candidates.extend(["minute", "hour", "day"])
-    elif min_diff <= pd.Timedelta(hours=1):
-        candidates.extend(["hour", "day", "week"])
-    elif min_diff <= pd.Timedelta(days=1):
-        candidates.extend(["day", "week", "month"])
-    else:
-        candidates.extend(["week", "month", "quarter", "year"])
-    # 去重并保持顺序。
-    seen: set[str] = set()
-    ordered: List[TemporalGranularity] = []
-    for item in candidates:
-        if item not in seen:
-            ordered.append(item)  # type: ignore[arg-type]
-            seen.add(item)
-    if not ordered:
-        ordered.append("day")  # type: ignore[arg-type]
-    return ordered
+        return list(_MINUTE_GRANULARITIES)
+    if min_diff <= pd.Timedelta(hours=1):
+        return list(_HOUR_GRANULARITIES)
+    if min_diff <= pd.Timedelta(days=1):
+        return list(_DAY_GRANULARITIES)
+    return list(_COARSE_GRANULARITIES)
 
 
 def _build_field_schema(series: Any, field_name: str, total_count: int) -> FieldSchema:
@@ -150,17 +171,22 @@ def _build_field_schema(series: Any, field_name: str, total_count: int) -> Field
     data_type = _infer_data_type(series=series)
     semantic_type = _infer_semantic_type(column_name=field_name, data_type=data_type)
     if semantic_type == "temporal" and data_type != "datetime":
-        pd = _get_pandas()
+        pd = get_pandas()
         try:
             series = pd.to_datetime(series, utc=True)
         except Exception as error:  # noqa: BLE001 - 保持 fail fast
             message = f"字段 {field_name} 无法解析为 datetime。"
             raise ValueError(message) from error
         data_type = "datetime"
-    missing_count = int(series.isna().sum())
+    # 非空值与频次各计算一次，供熵、值域、样本与时间粒度共享，避免重复扫描整列。
+    non_null = series.dropna()
+    value_counts = non_null.value_counts(sort=False)
+    # 缺失数即总长度减去非空长度，避免再分配一整列布尔掩码。
+    missing_count = len(series) - len(non_null)
     missing_ratio = missing_count / total_count if total_count > 0 else 0.0
-    distinct_count = int(series.nunique(dropna=True))
-    entropy = _calculate_entropy(series=series)
+    # 频次表即字典编码后的去重结果，其长度就是去重计数，无需再做一次哈希扫描。
+    distinct_count = len(value_counts)
+    entropy = _calculate_entropy(value_counts=value_counts)
     statistics = FieldStatistics(
         total_count=total_count,
         missing_count=missing_count,
@@ -168,17 +194,18 @@ def _build_field_schema(series: Any, field_name: str, total_count: int) -> Field
         missing_ratio=missing_ratio,
         entropy=entropy,
     )
-    sample_values = []
-    # 选取非空样本值用于展示。
-    non_null = series.dropna()
+    # 选取非空样本值用于展示，整列 astype(str) 替代逐值 str()。
     limit = 3 if semantic_type == "measure" else 5
-    for value in non_null.head(limit):
-        sample_values.append(str(value))
+    sample_values: List[str] = non_null.head(limit).astype(str).tolist()
     nullable = missing_count > 0
-    value_range = _build_value_range(series=series, data_type=data_type)
+    value_range = _build_value_range(
+        non_null=non_null,
+        value_counts=value_counts,
+        data_type=data_type,
+    )
     temporal_candidates: List[TemporalGranularity] = []
     if semantic_type == "temporal":
-        temporal_candidates = _recommend_temporal_granularities(series=series)
+        temporal_candidates = _recommend_temporal_granularities(non_null=non_null)
     field_schema = FieldSchema(
         name=field_name,
         path=[],
@@ -193,6 +220,71 @@ def _build_field_schema(series: Any, field_name: str, total_count: int) -> Field
     return field_schema
 
 
+def _scan_dataset(path: Path, sample_limit: int) -> _ScanResult:
+    """返回文件当前版本的扫描结果，未变化的文件直接复用读取、哈希与字段画像。
+
+    以读取前的文件元数据作为版本键；读取后元数据不一致说明扫描期间文件被改写，结果照常返回但不写入缓存。
+    """
+
+    stat_result = path.stat()
+    key = (str(path), stat_result.st_mtime_ns, stat_result.st_size, sample_limit)
+    with _SCAN_CACHE_LOCK:
+        cached = _SCAN_CACHE.pop(key, None)
+        if cached is not None:
+            _SCAN_CACHE[key] = cached
+            return cached
+    result = _read_dataset(path=path, sample_limit=sample_limit)
+    rescanned = path.stat()
+    if rescanned.st_mtime_ns != stat_result.st_mtime_ns or rescanned.st_size != stat_result.st_size:
+        return result
+    with _SCAN_CACHE_LOCK:
+        _SCAN_CACHE[key] = result
+        if len(_SCAN_CACHE) > _SCAN_CACHE_MAXSIZE:
+            _SCAN_CACHE.pop(next(iter(_SCAN_CACHE)))
+    return result
+
+
+def _read_dataset(path: Path, sample_limit: int) -> _ScanResult:
+    """读取 CSV 并计算哈希与字段画像。"""
+
+    pd = get_pandas()
+    dataframe = pd.read_csv(path)
+    # 计算基础数据维度。
+    row_count = int(dataframe.shape[0])
+    field_names = list(dataframe.columns)
+
+    def build_schema(column: str) -> FieldSchema:
+        """构建单列画像，串行与线程池路径共用。"""
+
+        return _build_field_schema(series=dataframe[column], field_name=column, total_count=row_count)
+
+    if len(field_names) < _PARALLEL_COLUMN_THRESHOLD:
+        field_schemas: List[FieldSchema] = [build_schema(column) for column in field_names]
+    else:
+        # 各列画像相互独立，聚合主要在 pandas/NumPy 的 C 层执行，宽表用线程池重叠计算。
+        # 延迟导入的全局缓存并非线程安全，进入线程池前先完成 numpy 加载。
+        get_numpy()
+        max_workers = max(1, min(os.cpu_count() or 1, len(field_names)))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            field_schemas = list(executor.map(build_schema, field_names))
+    sample_rows: List[Dict[str, str]] = render_sample_rows(dataframe=dataframe, limit=sample_limit)
+    warnings: List[str] = [
+        f"{field_schema.name} 缺失率较高"
+        for field_schema in field_schemas
+        if field_schema.statistics.missing_ratio > 0.3
+    ]
+    # 分块流式计算摘要，避免将整个文件读入内存。
+    with open(path, "rb") as file_handle:
+        hash_digest = hashlib.file_digest(file_handle, "sha256").hexdigest()
+    return _ScanResult(
+        hash_digest=hash_digest,
+        row_count=row_count,
+        field_schemas=tuple(field_schemas),
+        sample_rows=tuple(sample_rows),
+        warnings=tuple(warnings),
+    )
+
+
 class DatasetScannerAgent(Agent):
     """读取数据源并生成画像的 Agent。"""
 
@@ -219,14 +311,17 @@ class DatasetScannerAgent(Agent):
             输出 DatasetProfile 并携带 Trace Span。
         """
 
-        LOGGER.info(
-            "开始数据扫描",
-            extra={
-                "task_id": context.task_id,
-                "dataset_id": payload.dataset_id,
-            },
-        )
-        span_id = context.trace_recorder.start_span(
+        if LOGGER.isEnabledFor(logging.INFO):
+            LOGGER.info(
+                "开始数据扫描",
+                extra={
+                    "task_id": context.task_id,
+                    "dataset_id": payload.dataset_id,
+                },
+            )
+        # 本方法多次调用记录器，先绑定为局部变量，省去重复的属性查找。
+        trace_recorder = context.trace_recorder
+        span_id = trace_recorder.start_span(
             operation="data.scan",
             agent_name=self.name,
             slo=self.slo,
@@ -234,31 +329,10 @@ class DatasetScannerAgent(Agent):
             model_name=None,
             prompt_version=None,
         )
-        pd = _get_pandas()
-        dataframe = pd.read_csv(payload.path)
-        # 计算基础数据维度。
-        row_count = int(dataframe.shape[0])
-        field_names = list(dataframe.columns)
-        field_schemas: List[FieldSchema] = []
-        for column in field_names:
-            series = dataframe[column]
-            field_schema = _build_field_schema(
-                series=series,
-                field_name=column,
-                total_count=row_count,
-            )
-            field_schemas.append(field_schema)
-        sample_rows: List[Dict[str, str]] = []
-        for _, row in dataframe.head(payload.sample_limit).iterrows():
-            sample_row: Dict[str, str] = {}
-            for column in field_names:
-                sample_row[column] = str(row[column])
-            sample_rows.append(sample_row)
-        warnings: List[str] = []
-        for field_schema in field_schemas:
-            if field_schema.statistics.missing_ratio > 0.3:
-                warning = f"{field_schema.name} 缺失率较高"
-                warnings.append(warning)
+        scan_result = _scan_dataset(path=payload.path, sample_limit=payload.sample_limit)
+        row_count = scan_result.row_count
+        hash_digest = scan_result.hash_digest
+        warnings = list(scan_result.warnings)
         generated_at = context.clock.now()
         summary = DatasetSummary(
             dataset_id=payload.dataset_id,
@@ -270,19 +344,19 @@ class DatasetScannerAgent(Agent):
                 size=payload.sample_limit,
                 seed=0,
             ),
-            fields=field_schemas,
-            sample_rows=sample_rows,
+            # 缓存结果在多次扫描间共享，契约模型可变，交给调用方前逐个深拷贝，避免互相污染。
+            fields=[field_schema.model_copy(deep=True) for field_schema in scan_result.field_schemas],
+            sample_rows=[dict(row) for row in scan_result.sample_rows],
             warnings=warnings,
         )
-        hash_digest = hashlib.sha256(payload.path.read_bytes()).hexdigest()
-        context.trace_recorder.update_span(
+        trace_recorder.update_span(
             span_id=span_id,
             rows_in=row_count,
             rows_out=row_count,
             dataset_hash=hash_digest,
             schema_version=SCHEMA_VERSION,
         )
-        context.trace_recorder.record_event(
+        trace_recorder.record_event(
             span_id=span_id,
             event_type="sample",
             detail={
@@ -302,7 +376,7 @@ class DatasetScannerAgent(Agent):
             summary=summary,
             profiling_notes=warnings,
         )
-        trace_span = context.trace_recorder.finish_span(
+        trace_span = trace_recorder.finish_span(
             span_id=span_id,
             status="success",
             failure_category=None,
@@ -312,14 +386,15 @@ class DatasetScannerAgent(Agent):
                 "row_count": row_count,
             },
         )
-        LOGGER.info(
-            "数据扫描完成",
-            extra={
-                "task_id": context.task_id,
-                "dataset_id": payload.dataset_id,
-                "fields": len(field_schemas),
-            },
-        )
+        if LOGGER.isEnabledFor(logging.INFO):
+            LOGGER.info(
+                "数据扫描完成",
+                extra={
+                    "task_id": context.task_id,
+                    "dataset_id": payload.dataset_id,
+                    "fields": len(scan_result.field_schemas),
+                },
+            )
         return AgentOutcome(
             output=profile,
             span_id=span_id,
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import logging
 from dataclasses import dataclass
+from operator import attrgetter
 from typing import Optional
 
 from apps.backend.agents.base import Agent, AgentContext, AgentOutcome
@@ -15,7 +16,7 @@ from apps.backend.contracts.trace import SpanSLO
 LOGGER = logging.getLogger(__name__)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ExplanationPayload:
     """解释生成所需输入。"""
 
@@ -60,20 +61,18 @@ class ExplanationAgent(Agent):
         )
         profile = payload.dataset_profile
         plan = payload.plan
-        bullet_lines = []
-        bullet_lines.append(f"- 任务目标：{plan.refined_goal}")
-        top_fields = ", ".join(item.field_name for item in plan.field_plan[:3])
-        bullet_lines.append(f"- 推荐字段：{top_fields}")
+        # attrgetter 由 C 实现，map 直接驱动取值，省去生成器逐项执行字节码。
+        top_fields = ", ".join(map(attrgetter("field_name"), plan.field_plan[:3]))
         chart = plan.chart_plan[0]
-        bullet_lines.append(f"- 主推图表：{chart.template_id}（{chart.rationale}）")
+        bullet_lines = [
+            f"- 任务目标：{plan.refined_goal}",
+            f"- 推荐字段：{top_fields}",
+            f"- 主推图表：{chart.template_id}（{chart.rationale}）",
+        ]
         if payload.transform_preview is not None:
             bullet_lines.append(f"- 预览变换：{payload.transform_preview}")
-        bullet_lines.append(
-            f"- 数据行数：{profile.row_count}，字段数：{len(profile.summary.fields)}",
-        )
-        markdown_lines = ["## 计划摘要", ""]
-        markdown_lines.extend(bullet_lines)
-        markdown = "\n".join(markdown_lines)
+        bullet_lines.append(f"- 数据行数：{profile.row_count}，字段数：{len(profile.summary.fields)}")
+        markdown = "\n".join(["## 计划摘要", "", *bullet_lines])
         artifact = ExplanationArtifact(
             markdown=markdown,
             key_points=bullet_lines,
@@ -88,12 +87,13 @@ class ExplanationAgent(Agent):
                 "points": len(bullet_lines),
             },
         )
-        LOGGER.info(
-            "解释生成完成",
-            extra={
-                "task_id": context.task_id,
-            },
-        )
+        if LOGGER.isEnabledFor(logging.INFO):
+            LOGGER.info(
+                "解释生成完成",
+                extra={
+                    "task_id": context.task_id,
+                },
+            )
         return AgentOutcome(
             output=artifact,
             span_id=span_id,
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import logging
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, List
 
 from apps.backend.agents.base import Agent, AgentContext, AgentOutcome
 from apps.backend.contracts.dataset_profile import DatasetProfile
@@ -16,13 +16,15 @@ from apps.backend.contracts.plan import (
     PlanAssumption,
     Plan,
     TransformDraft,
+    TransformSpec,
+    render_transform_code,
 )
 from apps.backend.contracts.trace import SpanSLO
 
 LOGGER = logging.getLogger(__name__)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PlanPayload:
     """计划生成所需输入。"""
 
@@ -30,12 +32,6 @@ class PlanPayload:
     user_goal: str
 
 
-def _sort_field_recommendations(recommendations: List[FieldPlanItem]) -> List[FieldPlanItem]:
-    """按优先级排序字段推荐。"""
-
-    return sorted(recommendations, key=lambda item: item.priority)
-
-
 class PlanRefinementAgent(Agent):
     """根据数据画像与用户意图生成计划。"""
 
@@ -62,13 +58,14 @@ class PlanRefinementAgent(Agent):
             输出 Plan 契约与 Trace Span。
         """
 
-        LOGGER.info(
-            "开始计划细化",
-            extra={
-                "task_id": context.task_id,
-                "dataset_id": context.dataset_id,
-            },
-        )
+        if LOGGER.isEnabledFor(logging.INFO):
+            LOGGER.info(
+                "开始计划细化",
+                extra={
+                    "task_id": context.task_id,
+                    "dataset_id": context.dataset_id,
+                },
+            )
         span_id = context.trace_recorder.start_span(
             operation="plan.refine",
             agent_name=self.name,
@@ -79,11 +76,9 @@ class PlanRefinementAgent(Agent):
         )
         summary = payload.dataset_profile.summary
         field_plan_items: List[FieldPlanItem] = []
-        dimension_field = None
-        measure_field = None
-        temporal_field = None
-        priority_counter = 0
-        for field_schema in summary.fields:
+        # 每种语义只保留首个出现的字段，setdefault 一次完成判空与写入。
+        first_field_by_role: Dict[str, str] = {}
+        for priority, field_schema in enumerate(summary.fields):
             semantic = field_schema.semantic_type
             reason = "字段缺失率较低，适合用于分组。"
             if field_schema.statistics.missing_ratio > 0.3:
@@ -91,19 +86,16 @@ class PlanRefinementAgent(Agent):
             recommendation = FieldPlanItem(
                 field_name=field_schema.name,
                 semantic_role=semantic,
-                priority=priority_counter,
+                priority=priority,
                 rationale=reason,
                 operations=[],
             )
             field_plan_items.append(recommendation)
-            if semantic == "dimension" and dimension_field is None:
-                dimension_field = field_schema.name
-            if semantic == "measure" and measure_field is None:
-                measure_field = field_schema.name
-            if semantic == "temporal" and temporal_field is None:
-                temporal_field = field_schema.name
-            priority_counter += 1
-        sorted_recommendations = _sort_field_recommendations(recommendations=field_plan_items)
+            first_field_by_role.setdefault(semantic, field_schema.name)
+        dimension_field = first_field_by_role.get("dimension")
+        measure_field = first_field_by_role.get("measure")
+        temporal_field = first_field_by_role.get("temporal")
+        # priority 取自 enumerate 的遍历序号，field_plan_items 天然有序，无需再排序。
         chart_plan_items: List[ChartPlanItem] = []
         encodings: List[ChartChannelMapping] = []
         rationale = ""
@@ -167,33 +159,32 @@ class PlanRefinementAgent(Agent):
             layout_hint=None,
         )
         chart_plan_items.append(chart_candidate)
-        transform_code_lines: List[str] = []
-        transform_code_lines.append("import pandas as pd")
-        transform_code_lines.append("")
-        transform_code_lines.append("def transform(df: pd.DataFrame) -> pd.DataFrame:")
-        transform_code_lines.append("    \"\"\"根据推荐字段生成聚合结果。\"\"\"")
-        transform_code_lines.append("    if df.empty:")
-        transform_code_lines.append("        raise ValueError('输入数据不能为空')")
+        # 先确定结构化描述，代码由描述渲染，执行端据此直接分派而无需 exec。
         if dimension_field is not None and measure_field is not None:
-            transform_code_lines.append(
-                f"    grouped = df.groupby('{dimension_field}', as_index=False)['{measure_field}'].sum()",
+            transform_spec = TransformSpec(
+                kind="groupby_sum",
+                group_by=dimension_field,
+                measure=measure_field,
+                sort_by=measure_field,
+                ascending=False,
             )
-            transform_code_lines.append("    grouped = grouped.sort_values(by=grouped.columns[1], ascending=False)")
-            transform_code_lines.append("    return grouped")
         elif temporal_field is not None and measure_field is not None:
-            transform_code_lines.append(
-                f"    grouped = df.groupby('{temporal_field}', as_index=False)['{measure_field}'].sum()",
+            transform_spec = TransformSpec(
+                kind="groupby_sum",
+                group_by=temporal_field,
+                measure=measure_field,
+                sort_by=temporal_field,
+                ascending=True,
             )
-            transform_code_lines.append("    grouped = grouped.sort_values(by=grouped.columns[0], ascending=True)")
-            transform_code_lines.append("    return grouped")
         else:
-            transform_code_lines.append("    return df")
-        transform_code = "\n".join(transform_code_lines)
+            transform_spec = TransformSpec(kind="passthrough")
+        transform_code = render_transform_code(spec=transform_spec)
         transform_draft = TransformDraft(
             language="python",
             code=transform_code,
             output_table="derived_main",
             intent_summary="为推荐图表准备聚合数据。",
+            spec=transform_spec,
         )
         explain_outline = ExplainOutline(
             bullets=[
@@ -215,7 +206,7 @@ class PlanRefinementAgent(Agent):
             refined_goal=f"针对 {payload.user_goal} 的分析计划",
             generated_at=context.clock.now(),
             assumptions=assumptions,
-            field_plan=sorted_recommendations,
+            field_plan=field_plan_items,
             chart_plan=chart_plan_items,
             transform_drafts=[transform_draft],
             explain_outline=explain_outline,
@@ -227,16 +218,17 @@ class PlanRefinementAgent(Agent):
             failure_isolation_ratio=1.0,
             status_detail={
                 "chart_candidates": len(chart_plan_items),
-                "field_plan": len(sorted_recommendations),
-            },
-        )
-        LOGGER.info(
-            "计划细化完成",
-            extra={
-                "task_id": context.task_id,
-                "chart_plan": len(chart_plan_items),
+                "field_plan": len(field_plan_items),
             },
         )
+        if LOGGER.isEnabledFor(logging.INFO):
+            LOGGER.info(
+                "计划细化完成",
+                extra={
+                    "task_id": context.task_id,
+                    "chart_plan": len(chart_plan_items),
+                },
+            )
         return AgentOutcome(
             output=plan,
             span_id=span_id,
@@ -4,13 +4,15 @@ from __future__ import annotations
 
 import logging
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from types import CodeType, MappingProxyType
+from typing import Any, Callable, List, Mapping, Optional
 
 from apps.backend.agents.base import Agent, AgentContext, AgentOutcome
 from apps.backend.contracts.dataset_profile import DatasetProfile
 from apps.backend.contracts.metadata import SCHEMA_VERSION
-from apps.backend.contracts.plan import Plan, TransformDraft
+from apps.backend.contracts.plan import Plan, TransformDraft, TransformSpec, render_transform_code
 from apps.backend.contracts.transform import (
     OutputMetrics,
     OutputTable,
@@ -22,21 +24,24 @@ from apps.backend.contracts.transform import (
     TransformLog,
 )
 from apps.backend.contracts.trace import SpanSLO
+from apps.backend.infra.dataframe import get_pandas, render_sample_rows
 
 LOGGER = logging.getLogger(__name__)
 
-_PD_MODULE: Optional[Any] = None
-
-
-def _get_pandas() -> Any:
-    """延迟加载 pandas，避免在不支持环境中提前导入。"""
-
-    global _PD_MODULE
-    if _PD_MODULE is None:
-        import pandas as pd  # noqa: WPS433 - 延迟导入
+_DTYPE_KIND_TO_TYPE: Mapping[str, str] = MappingProxyType(
+    {
+        "i": "integer",
+        "u": "integer",
+        "f": "number",
+        "c": "number",
+        "b": "number",
+        "M": "datetime",
+    },
+)
+"""dtype.kind 到字段类型的映射，结果与逐个 is_*_dtype 判定一致；布尔列在 pandas 中属于数值类型，归为 number。"""
 
-        _PD_MODULE = pd
-    return _PD_MODULE
+_COMPILE_CACHE_MAXSIZE = 256
+"""变换代码编译缓存容量，相同源码复用已编译的代码对象。"""
 
 
 def _estimate_bytes(path: Path) -> Optional[int]:
@@ -51,20 +56,10 @@ def _estimate_bytes(path: Path) -> Optional[int]:
 def _infer_series_type(series: Any) -> str:
     """根据 pandas Series 推断字段类型。"""
 
-    pd = _get_pandas()
-    dtype = series.dtype
-    if pd.api.types.is_integer_dtype(dtype):
-        return "integer"
-    if pd.api.types.is_numeric_dtype(dtype):
-        return "number"
-    if pd.api.types.is_bool_dtype(dtype):
-        return "boolean"
-    if pd.api.types.is_datetime64_any_dtype(dtype):
-        return "datetime"
-    return "string"
+    return _DTYPE_KIND_TO_TYPE.get(series.dtype.kind, "string")
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TransformPayload:
     """变换执行所需输入。"""
 
@@ -74,7 +69,7 @@ class TransformPayload:
     sample_limit: int
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class TransformArtifacts:
     """变换阶段产出的复合对象，包含准备表与输出表。"""
 
@@ -82,6 +77,48 @@ class TransformArtifacts:
     output_table: OutputTable
 
 
+@lru_cache(maxsize=_COMPILE_CACHE_MAXSIZE)
+def _compile_transform(code: str) -> CodeType:
+    """编译变换源码，重复计划直接命中缓存，跳过解析与编译。"""
+
+    return compile(code, "<transform>", "exec")
+
+
+def _run_groupby_sum(dataframe: Any, spec: TransformSpec) -> Any:
+    """按分组字段对度量求和，与计划生成的 groupby 代码结果一致。"""
+
+    grouped = dataframe.groupby(spec.group_by, as_index=False, sort=False, observed=True)[spec.measure].sum()
+    if spec.sort_by == spec.measure:
+        grouped = grouped.sort_values(by=[spec.measure, spec.group_by], ascending=[spec.ascending, True])
+    elif spec.sort_by is not None:
+        grouped = grouped.sort_values(by=spec.sort_by, ascending=spec.ascending)
+    return grouped
+
+
+def _run_passthrough(dataframe: Any, spec: TransformSpec) -> Any:
+    """原样返回输入数据。"""
+
+    return dataframe
+
+
+_SPEC_HANDLERS: Mapping[str, Callable[[Any, TransformSpec], Any]] = MappingProxyType(
+    {
+        "groupby_sum": _run_groupby_sum,
+        "passthrough": _run_passthrough,
+    },
+)
+"""模板化变换的内置实现，按 TransformSpec.kind 分派。"""
+
+
+def _run_transform_spec(dataframe: Any, spec: TransformSpec) -> Any:
+    """执行结构化变换描述，空输入与生成代码一样直接报错。"""
+
+    if dataframe.empty:
+        raise ValueError("输入数据不能为空")
+    handler = _SPEC_HANDLERS[spec.kind]
+    return handler(dataframe, spec)
+
+
 def _ensure_transform_function(namespace: dict) -> callable:
     """保证提供的命名空间中存在 transform 函数。"""
 
@@ -108,7 +145,9 @@ class TransformExecutionAgent(Agent):
     def run(self, context: AgentContext, payload: TransformPayload) -> AgentOutcome:
         """运行变换并返回准备表与输出表。"""
 
-        span_id = context.trace_recorder.start_span(
+        # 本方法多次调用记录器，先绑定为局部变量，省去重复的属性查找。
+        trace_recorder = context.trace_recorder
+        span_id = trace_recorder.start_span(
             operation="transform.execute",
             agent_name=self.name,
             slo=self.slo,
@@ -117,10 +156,18 @@ class TransformExecutionAgent(Agent):
             prompt_version=None,
         )
         transform_draft = payload.plan.transform_drafts[0]
-        if transform_draft.language != "python":
+        transform_spec = transform_draft.spec
+        if transform_spec is not None and (
+            transform_draft.language != "python"
+            or transform_draft.code != render_transform_code(spec=transform_spec)
+        ):
+            # 结构化描述只与渲染出的 Python 代码等价；客户端改写了 code 或语言时描述已过期，
+            # 以草案本身为准，避免静默返回旧描述的结果。
+            transform_spec = None
+        if transform_spec is None and transform_draft.language != "python":
             message = f"暂不支持语言 {transform_draft.language}"
             raise ValueError(message)
-        pd = _get_pandas()
+        pd = get_pandas()
         dataframe = pd.read_csv(payload.dataset_path)
         exec_started_at = context.clock.now()
         namespace: dict = {}
@@ -129,15 +176,12 @@ class TransformExecutionAgent(Agent):
 
         # 构建 PreparedTable，确保输入上下文可回放。
         prepared_columns: List[TableColumn] = []
+        # 一次列式归约得到各列是否含空值，替代逐列 isna().sum()。
+        prepared_nullable = dataframe.isna().any()
         for column in dataframe.columns:
-            series = dataframe[column]
-            data_type = _infer_series_type(series=series)
+            data_type = _infer_series_type(series=dataframe[column])
             semantic_role = role_mapping.get(column, "dimension")
-            isna_result = series.isna()
-            if hasattr(isna_result, "sum"):
-                nullable = bool(isna_result.sum())
-            else:
-                nullable = any(value is None for value in series)
+            nullable = bool(prepared_nullable[column])
             prepared_columns.append(
                 TableColumn(
                     column_name=column,
@@ -147,9 +191,7 @@ class TransformExecutionAgent(Agent):
                     description=None,
                 ),
             )
-        prepared_sample_rows: List[Dict[str, str]] = []
-        for _, row in dataframe.head(payload.sample_limit).iterrows():
-            prepared_sample_rows.append({column: str(row[column]) for column in dataframe.columns})
+        prepared_sample_rows = render_sample_rows(dataframe=dataframe, limit=payload.sample_limit)
         prepared_table = PreparedTable(
             prepared_table_id=f"prepared_{transform_draft.transform_id}",
             source_id=payload.dataset_profile.dataset_id,
@@ -167,16 +209,21 @@ class TransformExecutionAgent(Agent):
                 sample_limit=payload.sample_limit,
             ),
         )
-        context.trace_recorder.update_span(
+        trace_recorder.update_span(
             span_id=span_id,
             rows_in=int(dataframe.shape[0]),
             dataset_hash=payload.dataset_profile.hash_digest,
             schema_version=SCHEMA_VERSION,
         )
         try:
-            exec(transform_draft.code, {"pd": pd}, namespace)  # noqa: S102 - 受控代码来源
-            transform_fn = _ensure_transform_function(namespace=namespace)
-            result_df = transform_fn(df=dataframe)
+            if transform_spec is not None:
+                # 计划生成的模板化变换直接分派到内置实现，跳过编译与 exec。
+                result_df = _run_transform_spec(dataframe=dataframe, spec=transform_spec)
+            else:
+                compiled = _compile_transform(code=transform_draft.code)
+                exec(compiled, {"pd": pd}, namespace)  # noqa: S102 - 受控代码来源
+                transform_fn = _ensure_transform_function(namespace=namespace)
+                result_df = transform_fn(df=dataframe)
         except Exception as error:  # noqa: BLE001 - 需要捕获以记录日志
             log_entry = TransformLog(
                 level="error",
@@ -184,7 +231,7 @@ class TransformExecutionAgent(Agent):
                 timestamp=context.clock.now(),
             )
             logs.append(log_entry)
-            context.trace_recorder.finish_span(
+            trace_recorder.finish_span(
                 span_id=span_id,
                 status="failed",
                 failure_category=error.__class__.__name__,
@@ -196,19 +243,13 @@ class TransformExecutionAgent(Agent):
             message = "transform 函数必须返回 pandas.DataFrame。"
             raise ValueError(message)
         exec_completed_at = context.clock.now()
-        sample_rows: List[Dict[str, str]] = []
-        for _, row in result_df.head(payload.sample_limit).iterrows():
-            sample_rows.append({column: str(row[column]) for column in result_df.columns})
+        sample_rows = render_sample_rows(dataframe=result_df, limit=payload.sample_limit)
         columns: List[TableColumn] = []
+        result_nullable = result_df.isna().any()
         for column in result_df.columns:
-            series = result_df[column]
-            data_type = _infer_series_type(series=series)
+            data_type = _infer_series_type(series=result_df[column])
             semantic_role = role_mapping.get(column, "dimension")
-            isna_result = series.isna()
-            if hasattr(isna_result, "sum"):
-                nullable = bool(isna_result.sum())
-            else:
-                nullable = any(value is None for value in series)
+            nullable = bool(result_nullable[column])
             columns.append(
                 TableColumn(
                     column_name=column,
@@ -236,12 +277,12 @@ class TransformExecutionAgent(Agent):
             logs=logs,
             generated_at=context.clock.now(),
         )
-        context.trace_recorder.update_span(
+        trace_recorder.update_span(
             span_id=span_id,
             rows_out=int(result_df.shape[0]),
         )
         if output_table.metrics.row_limit_applied:
-            context.trace_recorder.record_event(
+            trace_recorder.record_event(
                 span_id=span_id,
                 event_type="emit_partial",
                 detail={
@@ -249,7 +290,7 @@ class TransformExecutionAgent(Agent):
                     "limit": payload.sample_limit,
                 },
             )
-        trace_span = context.trace_recorder.finish_span(
+        trace_span = trace_recorder.finish_span(
             span_id=span_id,
             status="success",
             failure_category=None,
@@ -259,14 +300,15 @@ class TransformExecutionAgent(Agent):
                 "output_rows": output_table.metrics.rows_out,
             },
         )
-        LOGGER.info(
-            "数据变换完成",
-            extra={
-                "task_id": context.task_id,
-                "dataset_id": context.dataset_id,
-                "rows": output_table.metrics.rows_out,
-            },
-        )
+        if LOGGER.isEnabledFor(logging.INFO):
+            LOGGER.info(
+                "数据变换完成",
+                extra={
+                    "task_id": context.task_id,
+                    "dataset_id": context.dataset_id,
+                    "rows": output_table.metrics.rows_out,
+                },
+            )
         return AgentOutcome(
             output=TransformArtifacts(
                 prepared_table=prepared_table,
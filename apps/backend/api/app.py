@@ -2,17 +2,46 @@
 
 from __future__ import annotations
 
+import asyncio
+import inspect
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+
 from fastapi import FastAPI
 
+from apps.backend.api.dependencies import get_api_recorder, get_trace_store
 from apps.backend.api.routes import router
 
 
+async def _resolve_flush_targets(app: FastAPI) -> Dict[int, Any]:
+    """按 dependency_overrides 解析路由将使用的 Trace 缓存与落盘器，以实例 id 去重。"""
+
+    targets: Dict[int, Any] = {}
+    for provider in (get_trace_store, get_api_recorder):
+        target = app.dependency_overrides.get(provider, provider)()
+        if inspect.isawaitable(target):
+            target = await target
+        targets.setdefault(id(target), target)
+    return targets
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """启动时登记一次落盘实例，关闭前等待其写完，避免丢失尾部记录。"""
+
+    flush_targets = await _resolve_flush_targets(app=app)
+    yield
+    for target in flush_targets.values():
+        await asyncio.to_thread(target.flush)
+
+
 def create_app() -> FastAPI:
     """构建 FastAPI 应用实例。"""
 
     app = FastAPI(
         title="Data Interface API",
         version="0.1.0",
+        lifespan=_lifespan,
     )
     app.include_router(router)
     return app
@@ -13,45 +13,49 @@ from apps.backend.agents import (
     ChartRecommendationAgent,
 )
 from apps.backend.infra.clock import UtcClock
-from apps.backend.infra.persistence import ApiRecorder
+from apps.backend.infra.persistence import ApiRecorder, QueuedApiRecorder
 from apps.backend.services.pipeline import PipelineAgents
 from apps.backend.services.task_runner import TaskRunner
 from apps.backend.stores import DatasetStore, TraceStore
 
 
+# 实例在私有的 lru_cache 构造函数中按进程缓存；对外的依赖函数声明为协程，FastAPI 在事件循环中
+# 直接解析，不再为每个子依赖占用一次线程池往返。lru_cache 不能直接包装协程函数（缓存的协程只能 await 一次）。
+
+
 @lru_cache
-def get_clock() -> UtcClock:
-    """提供全局 UTC 时钟实例。"""
+def _build_clock() -> UtcClock:
+    """构造全局 UTC 时钟实例。"""
 
     return UtcClock()
 
 
 @lru_cache
-def get_dataset_store() -> DatasetStore:
-    """提供数据画像缓存。"""
+def _build_dataset_store() -> DatasetStore:
+    """构造数据画像缓存。"""
 
     return DatasetStore()
 
 
 @lru_cache
-def get_trace_store() -> TraceStore:
-    """提供 Trace 缓存。"""
+def _build_trace_store() -> TraceStore:
+    """构造 Trace 缓存，文件写入由后台线程完成。"""
 
     base_path = Path("var/traces")
-    return TraceStore(base_path=base_path)
+    return TraceStore(base_path=base_path, write_behind=True)
 
 
 @lru_cache
-def get_api_recorder() -> ApiRecorder:
-    """提供 API 请求/响应落盘器。"""
+def _build_api_recorder() -> ApiRecorder:
+    """构造 API 请求/响应落盘器，写盘在后台线程完成，不占用请求路径。"""
 
     base_path = Path("var/api_logs")
-    return ApiRecorder(base_path=base_path)
+    return QueuedApiRecorder(base_path=base_path)
 
 
 @lru_cache
-def get_pipeline_agents() -> PipelineAgents:
-    """提供多 Agent 流程所需的实例集合。"""
+def _build_pipeline_agents() -> PipelineAgents:
+    """构造多 Agent 流程所需的实例集合。"""
 
     return PipelineAgents(
         scanner=DatasetScannerAgent(),
@@ -63,13 +67,49 @@ def get_pipeline_agents() -> PipelineAgents:
 
 
 @lru_cache
-def get_task_runner() -> TaskRunner:
-    """提供任务执行与 SSE 管理器。"""
+def _build_task_runner() -> TaskRunner:
+    """构造任务执行与 SSE 管理器。"""
 
     return TaskRunner(
-        dataset_store=get_dataset_store(),
-        trace_store=get_trace_store(),
-        clock=get_clock(),
-        agents=get_pipeline_agents(),
-        api_recorder=get_api_recorder(),
+        dataset_store=_build_dataset_store(),
+        trace_store=_build_trace_store(),
+        clock=_build_clock(),
+        agents=_build_pipeline_agents(),
+        api_recorder=_build_api_recorder(),
     )
+
+
+async def get_clock() -> UtcClock:
+    """提供全局 UTC 时钟实例。"""
+
+    return _build_clock()
+
+
+async def get_dataset_store() -> DatasetStore:
+    """提供数据画像缓存。"""
+
+    return _build_dataset_store()
+
+
+async def get_trace_store() -> TraceStore:
+    """提供 Trace 缓存。"""
+
+    return _build_trace_store()
+
+
+async def get_api_recorder() -> ApiRecorder:
+    """提供 API 请求/响应落盘器。"""
+
+    return _build_api_recorder()
+
+
+async def get_pipeline_agents() -> PipelineAgents:
+    """提供多 Agent 流程所需的实例集合。"""
+
+    return _build_pipeline_agents()
+
+
+async def get_task_runner() -> TaskRunner:
+    """提供任务执行与 SSE 管理器。"""
+
+    return _build_task_runner()
@@ -2,18 +2,24 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
+import os
+import secrets
+import time
 from datetime import timedelta
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional, Tuple
-from uuid import uuid4
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import Response, StreamingResponse
 
 from apps.backend.agents import AgentContext, ScanPayload, TransformPayload, ChartPayload
-from apps.backend.compat import model_dump
+from apps.backend.compat import TypeAdapter
 from apps.backend.agents.transform import TransformArtifacts
 from apps.backend.api.dependencies import (
     get_api_recorder,
@@ -51,7 +57,7 @@ from apps.backend.contracts.metadata import SCHEMA_VERSION
 from apps.backend.contracts.encoding_patch import EncodingPatch, EncodingPatchOp
 from apps.backend.contracts.plan import Plan
 from apps.backend.contracts.task_event import TaskEvent
-from apps.backend.contracts.trace import TraceRecord, TraceSpan, SpanMetrics, SpanEvent, SpanSLO
+from apps.backend.contracts.trace import TraceRecord, TraceSpan, SpanEvent
 from apps.backend.contracts.transform import (
     PreparedTable,
     PreparedTableLimits,
@@ -62,7 +68,7 @@ from apps.backend.contracts.transform import (
 )
 from apps.backend.infra.persistence import ApiRecorder
 from apps.backend.infra.tracing import TraceRecorder
-from apps.backend.services.pipeline import PipelineConfig, PipelineOutcome, execute_pipeline
+from apps.backend.services.pipeline import PipelineAgents, PipelineConfig, PipelineOutcome, execute_pipeline
 from apps.backend.services.task_runner import TaskRunner
 from apps.backend.stores import DatasetStore, TraceStore
 
@@ -81,6 +87,49 @@ SCHEMA_EXPORT_MODELS: dict[str, type] = {
     TaskEvent.schema_name(): TaskEvent,
 }
 
+_SEMANTIC_ROLE_MAP: Mapping[str, str] = MappingProxyType(
+    {
+        "dimension": "dimension",
+        "measure": "measure",
+        "temporal": "temporal",
+        "identifier": "identifier",
+        "geo": "dimension",
+        "unknown": "dimension",
+    },
+)
+"""FieldSchema.semantic_type 到 TableColumn.semantic_role 的只读映射，模块级常量避免每次调用重建。"""
+
+_PATH_CHECK_TTL_SECONDS = 5.0
+"""数据源路径存在性校验的缓存时间窗，窗口内同一路径不再重复 stat。"""
+
+_PATH_CHECK_CACHE_MAXSIZE = 1024
+
+_TASK_EVENT_ADAPTER = TypeAdapter(TaskEvent)
+"""SSE 事件编码器，dump_json 直接产出 UTF-8 字节，省去 str 帧再编码。"""
+
+_SSE_SNAPSHOT_ADAPTER = TypeAdapter(Dict[str, str])
+"""SSE 快照帧编码器，与事件帧同由 pydantic-core 编码，转义规则一致。"""
+
+_SSE_END_FRAME = b"event: end\n\n"
+
+_RESPONSE_ADAPTERS: Mapping[type, TypeAdapter] = MappingProxyType(
+    {
+        model: TypeAdapter(model)
+        for model in (ScanResponse, PlanResponse, TraceReplayResponse, TaskResultResponse)
+    },
+)
+"""直接返回字节的响应模型序列化器，模块加载时构建一次，dump_json 直接产出 UTF-8 字节。"""
+
+
+@lru_cache(maxsize=None)
+def _contract_schema_text(model: type) -> str:
+    """生成契约模型 JSONSchema 的落盘文本；模型在进程内不变，首次导出后直接复用。
+
+    缓存只保存不可变的文本，调用方每次解析出新的字典，修改返回值不会污染缓存。
+    """
+
+    return json.dumps(model.model_json_schema(), ensure_ascii=False, indent=2)
+
 
 def _create_trace_recorder(clock) -> TraceRecorder:
     """构造 TraceRecorder。"""
@@ -88,14 +137,88 @@ def _create_trace_recorder(clock) -> TraceRecorder:
     return TraceRecorder(clock=clock)
 
 
+def _json_response(payload: object, *, headers: Optional[Mapping[str, str]] = None) -> Response:
+    """将已校验的响应模型直接编码为 JSON 字节，跳过 FastAPI 的响应模型二次校验与线程池往返。"""
+
+    content = _RESPONSE_ADAPTERS[type(payload)].dump_json(payload, by_alias=True)
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+def _raw_json_response(content: bytes, *, headers: Optional[Mapping[str, str]] = None) -> Response:
+    """直接返回已编码的 JSON 字节。"""
+
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+def _weak_etag(token: str) -> str:
+    """以不可变结果的唯一标识构造弱 ETag。"""
+
+    return f'W/"{token}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """按弱比较规则判断 If-None-Match 是否命中给定 ETag。"""
+
+    if if_none_match is None:
+        return False
+    opaque_tag = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque_tag:
+            return True
+    return False
+
+
+def _not_modified_response(api_recorder: ApiRecorder, endpoint: str, etag: str) -> Response:
+    """落盘并返回 304，客户端缓存的结果仍然有效。"""
+
+    _record_response(
+        api_recorder=api_recorder,
+        endpoint=endpoint,
+        payload={"status_code": status.HTTP_304_NOT_MODIFIED, "etag": etag},
+    )
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+@lru_cache(maxsize=_PATH_CHECK_CACHE_MAXSIZE)
+def _checked_path(path_str: str, epoch: int) -> Path:
+    """stat 校验路径存在；结果按 (路径, 时间窗) 缓存，不存在时抛出的异常不会进入缓存。"""
+
+    try:
+        os.stat(path_str)
+    # 含 NUL 字节的路径抛 ValueError，符号链接循环、名称过长等抛 OSError，均按不可用路径返回 400。
+    except (OSError, ValueError) as error:
+        raise _missing_path_error(path_str=path_str) from error
+    return Path(path_str)
+
+
+def _missing_path_error(path_str: str) -> HTTPException:
+    """构造数据源路径不可用的 400 异常。"""
+
+    message = f"数据源路径不存在: {path_str}"
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=message)
+
+
 def _ensure_path(path_str: str) -> Path:
-    """校验本地路径存在。"""
+    """校验本地路径存在，同一路径在 TTL 时间窗内只做一次 stat。"""
+
+    epoch = int(time.monotonic() // _PATH_CHECK_TTL_SECONDS)
+    return _checked_path(path_str=path_str, epoch=epoch)
 
-    path = Path(path_str)
-    if not path.exists():
-        message = f"数据源路径不存在: {path_str}"
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=message)
-    return path
+
+def _dataset_vanished(api_recorder: ApiRecorder, endpoint: str, path_str: str) -> HTTPException:
+    """数据源在缓存的校验之后被删除：清空校验缓存并按路径不存在落盘，返回与校验失败相同的 400。"""
+
+    _checked_path.cache_clear()
+    error = _missing_path_error(path_str=path_str)
+    _record_error(
+        api_recorder=api_recorder,
+        endpoint=endpoint,
+        error_type=error.__class__.__name__,
+        error_message=str(error.detail),
+        status_code=error.status_code,
+    )
+    return error
 
 
 def _record_request(api_recorder: ApiRecorder, endpoint: str, payload: object) -> None:
@@ -138,6 +261,24 @@ def _record_error(
     )
 
 
+def _trace_not_found(api_recorder: ApiRecorder, endpoint: str, task_id: str) -> HTTPException:
+    """落盘 Trace 缺失错误并构造 404 异常，由调用方直接 raise。
+
+    以 get() 探测代替捕获 KeyError，但 detail 与 error_type 仍与 TraceStore.require 抛出的 KeyError 保持一致，
+    客户端与落盘日志看到的错误契约不变。
+    """
+
+    error = KeyError(f"task_id={task_id} 未找到 Trace 记录。")
+    _record_error(
+        api_recorder=api_recorder,
+        endpoint=endpoint,
+        error_type=error.__class__.__name__,
+        error_message=str(error),
+        status_code=status.HTTP_404_NOT_FOUND,
+    )
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(error))
+
+
 def _load_or_scan_profile(
     *,
     dataset_id: str,
@@ -152,9 +293,9 @@ def _load_or_scan_profile(
     """从缓存中加载画像，或触发扫描生成。"""
 
     spans: List[TraceSpan] = []
-    try:
-        profile = dataset_store.require(dataset_id=dataset_id)
-    except KeyError:
+    # 未命中是冷启动后的常态，以 None 分支代替 KeyError 异常控制流。
+    profile = dataset_store.get(dataset_id=dataset_id)
+    if profile is None:
         payload = ScanPayload(
             dataset_id=dataset_id,
             dataset_name=dataset_name,
@@ -208,17 +349,11 @@ def _summary_to_prepared_table(
 ) -> PreparedTable:
     """将 DatasetSummary 转换为 PreparedTable。"""
 
-    semantic_role_map = {
-        "dimension": "dimension",
-        "measure": "measure",
-        "temporal": "temporal",
-        "identifier": "identifier",
-        "geo": "dimension",
-        "unknown": "dimension",
-    }
+    # 逐字段查表前取一次绑定方法，循环内不再重复属性查找。
+    role_of = _SEMANTIC_ROLE_MAP.get
     columns: List[TableColumn] = []
     for field in summary.fields:
-        role = semantic_role_map.get(field.semantic_type, "dimension")
+        role = role_of(field.semantic_type, "dimension")
         columns.append(
             TableColumn(
                 column_name=field.name,
@@ -228,13 +363,12 @@ def _summary_to_prepared_table(
                 description=field.description or field.title,
             ),
         )
-    sample_rows: List[dict[str, str]] = []
-    for row in summary.sample_rows[:sample_limit]:
-        normalized_row: dict[str, str] = {}
-        for column in columns:
-            value = row.get(column.column_name, "")
-            normalized_row[column.column_name] = str(value)
-        sample_rows.append(normalized_row)
+    # 列名只取一次，逐单元格处理时不再重复访问 pydantic 模型属性。
+    column_names = [column.column_name for column in columns]
+    sample_rows: List[dict[str, str]] = [
+        {name: str(row.get(name, "")) for name in column_names}
+        for row in summary.sample_rows[:sample_limit]
+    ]
     stats = PreparedTableStats(
         row_count=summary.row_count,
         estimated_bytes=None,
@@ -257,6 +391,16 @@ def _summary_to_prepared_table(
     return prepared
 
 
+def _uuid4_batch(count: int) -> List[str]:
+    """一次读取随机字节生成多条 UUID4 字符串，格式与 str(uuid4()) 一致。"""
+
+    random_bytes = os.urandom(16 * count)
+    return [
+        str(UUID(bytes=random_bytes[offset : offset + 16], version=4))
+        for offset in range(0, 16 * count, 16)
+    ]
+
+
 def _rebuild_trace_record(
     *,
     original: TraceRecord,
@@ -265,72 +409,55 @@ def _rebuild_trace_record(
     """根据落盘 Trace 生成新的同构 Trace。"""
 
     base_started_at = clock.now()
+    # 全部 span_id 与 trace_id 一次生成，末位留给 trace_id。
+    new_ids = _uuid4_batch(count=len(original.spans) + 1)
     span_id_map: dict[str, str] = {}
     rebuilt_spans: List[TraceSpan] = []
     for index, span in enumerate(original.spans):
-        new_span_id = str(uuid4())
+        new_span_id = new_ids[index]
         span_id_map[span.span_id] = new_span_id
         parent_new_id: Optional[str] = None
         if span.parent_span_id is not None:
             parent_new_id = span_id_map.get(span.parent_span_id)
         started_at = base_started_at + timedelta(milliseconds=index * 100)
-        slo_copy = SpanSLO.model_validate(model_dump(span.slo))
-        metrics_source = span.metrics
-        metrics_copy = SpanMetrics(
-            duration_ms=metrics_source.duration_ms,
-            retry_count=metrics_source.retry_count,
-            rows_in=metrics_source.rows_in,
-            rows_out=metrics_source.rows_out,
-        )
-        events_copy: List[SpanEvent] = []
-        for event_index, event in enumerate(span.events):
-            event_timestamp = started_at + timedelta(milliseconds=event_index * 10 + 1)
-            events_copy.append(
-                SpanEvent(
-                    event_type=event.event_type,
-                    timestamp=event_timestamp,
-                    detail=event.detail,
-                ),
+        # 源对象均为已校验的契约模型，model_copy 浅拷贝即可，省去 dump + validate 往返。
+        events_copy: List[SpanEvent] = [
+            event.model_copy(
+                update={"timestamp": started_at + timedelta(milliseconds=event_index * 10 + 1)},
             )
+            for event_index, event in enumerate(span.events)
+        ]
+        # 新时间戳均晚于 started_at 且为 UTC，校验器约束天然成立，直接复制 Span 跳过逐字段校验。
         rebuilt_spans.append(
-            TraceSpan(
-                span_id=new_span_id,
-                parent_span_id=parent_new_id,
-                operation=span.operation,
-                agent_name=span.agent_name,
-                status=span.status,
-                started_at=started_at,
-                slo=slo_copy,
-                metrics=metrics_copy,
-                model_name=span.model_name,
-                prompt_version=span.prompt_version,
-                dataset_hash=span.dataset_hash,
-                schema_version=span.schema_version,
-                abort_reason=span.abort_reason,
-                error_class=span.error_class,
-                fallback_path=span.fallback_path,
-                sse_seq=span.sse_seq,
-                events=events_copy,
+            span.model_copy(
+                update={
+                    "span_id": new_span_id,
+                    "parent_span_id": parent_new_id,
+                    "started_at": started_at,
+                    "slo": span.slo.model_copy(),
+                    "metrics": span.metrics.model_copy(),
+                    "events": events_copy,
+                },
             ),
         )
-    rebuilt_trace = TraceRecord(
-        trace_id=str(uuid4()),
-        task_id=original.task_id,
-        dataset_id=original.dataset_id,
-        created_at=clock.now(),
-        spans=rebuilt_spans,
+    return original.model_copy(
+        update={
+            "trace_id": new_ids[-1],
+            "created_at": clock.now(),
+            "spans": rebuilt_spans,
+        },
     )
-    return rebuilt_trace
 
 
-@router.post("/api/data/scan", response_model=ScanResponse)
-def trigger_scan(
+@router.post("/api/data/scan", responses={200: {"model": ScanResponse}})
+async def trigger_scan(
     request: ScanRequest,
     dataset_store: DatasetStore = Depends(get_dataset_store),
     trace_store: TraceStore = Depends(get_trace_store),
     clock=Depends(get_clock),
+    agents: PipelineAgents = Depends(get_pipeline_agents),
     api_recorder: ApiRecorder = Depends(get_api_recorder),
-) -> ScanResponse:
+) -> Response:
     """触发数据扫描流程。"""
 
     endpoint = "api_data_scan"
@@ -338,7 +465,6 @@ def trigger_scan(
     try:
         dataset_path = _ensure_path(path_str=request.dataset_path)
         trace_recorder = _create_trace_recorder(clock=clock)
-        agents = get_pipeline_agents()
         context = AgentContext(
             task_id=request.task_id,
             dataset_id=request.dataset_id,
@@ -352,19 +478,35 @@ def trigger_scan(
             path=dataset_path,
             sample_limit=request.sample_limit,
         )
-        outcome = agents.scanner.run(context=context, payload=payload)
-        profile = outcome.output
-        dataset_store.save(dataset_id=request.dataset_id, profile=profile)
-        trace = trace_recorder.build_trace(
-            task_id=request.task_id,
-            dataset_id=request.dataset_id,
-            spans=[outcome.trace_span],
-        )
-        trace_store.save(trace=trace)
-        response = ScanResponse(
-            profile=profile,
-            trace=trace,
-        )
+
+        def run_scan() -> Response:
+            """工作线程内完成扫描、落盘、落盘记录与编码，事件循环只负责等待结果。"""
+
+            outcome = agents.scanner.run(context=context, payload=payload)
+            profile = outcome.output
+            dataset_store.save(dataset_id=request.dataset_id, profile=profile)
+            trace = trace_recorder.build_trace(
+                task_id=request.task_id,
+                dataset_id=request.dataset_id,
+                spans=[outcome.trace_span],
+            )
+            trace_store.save(trace=trace)
+            response = ScanResponse(
+                profile=profile,
+                trace=trace,
+            )
+            _record_response(api_recorder=api_recorder, endpoint=endpoint, payload=response)
+            return _json_response(payload=response)
+
+        # 扫描及其后的序列化均属阻塞 IO/CPU，整体交给工作线程执行，事件循环可继续处理 SSE 与轮询请求。
+        return await asyncio.to_thread(run_scan)
+    except FileNotFoundError as error:
+        # 时间窗内的缓存校验之后文件被删除，读取时才发现，仍按路径不存在返回 400。
+        raise _dataset_vanished(
+            api_recorder=api_recorder,
+            endpoint=endpoint,
+            path_str=request.dataset_path,
+        ) from error
     except HTTPException as error:
         _record_error(
             api_recorder=api_recorder,
@@ -384,18 +526,17 @@ def trigger_scan(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
         raise
-    _record_response(api_recorder=api_recorder, endpoint=endpoint, payload=response)
-    return response
 
 
-@router.post("/api/plan/refine", response_model=PlanResponse)
-def refine_plan(
+@router.post("/api/plan/refine", responses={200: {"model": PlanResponse}})
+async def refine_plan(
     request: PlanRequest,
     dataset_store: DatasetStore = Depends(get_dataset_store),
     trace_store: TraceStore = Depends(get_trace_store),
     clock=Depends(get_clock),
+    agents: PipelineAgents = Depends(get_pipeline_agents),
     api_recorder: ApiRecorder = Depends(get_api_recorder),
-) -> PlanResponse:
+) -> Response:
     """生成计划、解释与 Trace。"""
 
     endpoint = "api_plan_refine"
@@ -403,7 +544,6 @@ def refine_plan(
     try:
         dataset_path = _ensure_path(path_str=request.dataset_path)
         trace_recorder = _create_trace_recorder(clock=clock)
-        agents = get_pipeline_agents()
         context = AgentContext(
             task_id=request.task_id,
             dataset_id=request.dataset_id,
@@ -419,24 +559,40 @@ def refine_plan(
             sample_limit=request.sample_limit,
             user_goal=request.user_goal,
         )
-        outcome: PipelineOutcome = execute_pipeline(
-            config=config,
-            context=context,
-            trace_recorder=trace_recorder,
-            agents=agents,
-        )
-        dataset_store.save(dataset_id=request.dataset_id, profile=outcome.profile)
-        trace_store.save(trace=outcome.trace)
-        response = PlanResponse(
-            profile=outcome.profile,
-            plan=outcome.plan,
-            prepared_table=outcome.prepared_table,
-            output_table=outcome.output_table,
-            chart=outcome.chart,
-            encoding_patch=outcome.encoding_patch,
-            explanation=outcome.explanation,
-            trace=outcome.trace,
-        )
+
+        def run_plan() -> Response:
+            """工作线程内完成流水线、落盘、落盘记录与编码，事件循环只负责等待结果。"""
+
+            outcome: PipelineOutcome = execute_pipeline(
+                config=config,
+                context=context,
+                trace_recorder=trace_recorder,
+                agents=agents,
+            )
+            dataset_store.save(dataset_id=request.dataset_id, profile=outcome.profile)
+            trace_store.save(trace=outcome.trace)
+            response = PlanResponse(
+                profile=outcome.profile,
+                plan=outcome.plan,
+                prepared_table=outcome.prepared_table,
+                output_table=outcome.output_table,
+                chart=outcome.chart,
+                encoding_patch=outcome.encoding_patch,
+                explanation=outcome.explanation,
+                trace=outcome.trace,
+            )
+            _record_response(api_recorder=api_recorder, endpoint=endpoint, payload=response)
+            return _json_response(payload=response)
+
+        # 整条流水线及其后的序列化在工作线程中执行，与 TaskRunner 一致，避免阻塞事件循环。
+        return await asyncio.to_thread(run_plan)
+    except FileNotFoundError as error:
+        # 时间窗内的缓存校验之后文件被删除，读取时才发现，仍按路径不存在返回 400。
+        raise _dataset_vanished(
+            api_recorder=api_recorder,
+            endpoint=endpoint,
+            path_str=request.dataset_path,
+        ) from error
     except HTTPException as error:
         _record_error(
             api_recorder=api_recorder,
@@ -456,63 +612,55 @@ def refine_plan(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         )
         raise
-    _record_response(api_recorder=api_recorder, endpoint=endpoint, payload=response)
-    return response
 
 
-@router.get("/api/trace/{task_id}", response_model=TraceRecord)
+@router.get("/api/trace/{task_id}", responses={200: {"model": TraceRecord}})
 def get_trace(
     task_id: str,
+    if_none_match: Optional[str] = Header(default=None),
     trace_store: TraceStore = Depends(get_trace_store),
     api_recorder: ApiRecorder = Depends(get_api_recorder),
-) -> TraceRecord:
-    """根据 task_id 获取 Trace 记录。"""
+) -> Response:
+    """根据 task_id 获取 Trace 记录，支持 If-None-Match 条件请求。"""
 
     endpoint = "api_trace_get"
     _record_request(api_recorder=api_recorder, endpoint=endpoint, payload={"task_id": task_id})
-    try:
-        trace = trace_store.require(task_id=task_id)
-    except KeyError as error:
-        _record_error(
-            api_recorder=api_recorder,
-            endpoint=endpoint,
-            error_type=error.__class__.__name__,
-            error_message=str(error),
-            status_code=status.HTTP_404_NOT_FOUND,
-        )
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(error)) from error
+    trace = trace_store.get(task_id=task_id)
+    if trace is None:
+        raise _trace_not_found(api_recorder=api_recorder, endpoint=endpoint, task_id=task_id)
+    # 同一 task_id 重新落盘会生成新的 trace_id，以其作为 ETag 可保证内容变化时失效。
+    etag = _weak_etag(token=trace.trace_id)
+    if _etag_matches(if_none_match=if_none_match, etag=etag):
+        return _not_modified_response(api_recorder=api_recorder, endpoint=endpoint, etag=etag)
+    # 响应体由取到的同一 Trace 对象编码，ETag、落盘记录与返回字节始终对应同一份 Trace。
+    trace_json = trace_store.dump_json(trace=trace)
     _record_response(api_recorder=api_recorder, endpoint=endpoint, payload=trace)
-    return trace
+    return _raw_json_response(content=trace_json, headers={"ETag": etag})
 
 
-@router.post("/api/trace/replay", response_model=TraceReplayResponse)
+@router.post("/api/trace/replay", responses={200: {"model": TraceReplayResponse}})
 def replay_trace(
     request: TraceReplayRequest,
     trace_store: TraceStore = Depends(get_trace_store),
     clock=Depends(get_clock),
     api_recorder: ApiRecorder = Depends(get_api_recorder),
-) -> TraceReplayResponse:
+) -> Response:
     """回放已存储的 Trace。"""
 
     endpoint = "api_trace_replay"
     _record_request(api_recorder=api_recorder, endpoint=endpoint, payload=request)
-    try:
-        trace = trace_store.require(task_id=request.task_id)
-    except KeyError as error:
-        _record_error(
-            api_recorder=api_recorder,
-            endpoint=endpoint,
-            error_type=error.__class__.__name__,
-            error_message=str(error),
-            status_code=status.HTTP_404_NOT_FOUND,
-        )
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(error)) from error
+    trace = trace_store.get(task_id=request.task_id)
+    if trace is None:
+        raise _trace_not_found(api_recorder=api_recorder, endpoint=endpoint, task_id=request.task_id)
     try:
         if request.mode == "rebuild":
             replay_trace_record = _rebuild_trace_record(original=trace, clock=clock)
+            response = TraceReplayResponse.model_construct(trace=replay_trace_record)
+            body = _RESPONSE_ADAPTERS[TraceReplayResponse].dump_json(response, by_alias=True)
         else:
-            replay_trace_record = trace
-        response = TraceReplayResponse(trace=replay_trace_record)
+            response = TraceReplayResponse.model_construct(trace=trace)
+            # 原样回放时复用 Store 中缓存的 Trace 编码，只拼接外层包装，不再遍历整棵 Trace。
+            body = b'{"trace":' + trace_store.dump_json(trace=trace) + b"}"
     except Exception as error:  # noqa: BLE001 - 兜底记录异常
         LOGGER.exception("Trace 回放失败", extra={"endpoint": endpoint})
         _record_error(
@@ -524,7 +672,7 @@ def replay_trace(
         )
         raise
     _record_response(api_recorder=api_recorder, endpoint=endpoint, payload=response)
-    return response
+    return _raw_json_response(content=body)
 
 
 @router.post("/api/task/submit", response_model=TaskSubmitResponse)
@@ -539,7 +687,8 @@ async def submit_task(
     _record_request(api_recorder=api_recorder, endpoint=endpoint, payload=request)
     try:
         dataset_path = _ensure_path(path_str=request.dataset_path)
-        task_id = request.task_id or f"task_{uuid4()}"
+        # task_id 仅作不透明标识，token_hex 省去 UUID 对象构造与格式化，与 chart_id 一致。
+        task_id = request.task_id or f"task_{secrets.token_hex(16)}"
         config = PipelineConfig(
             task_id=task_id,
             dataset_id=request.dataset_id,
@@ -574,13 +723,14 @@ async def submit_task(
     return response
 
 
-@router.get("/api/task/{task_id}/result", response_model=TaskResultResponse)
+@router.get("/api/task/{task_id}/result", responses={200: {"model": TaskResultResponse}})
 def fetch_task_result(
     task_id: str,
+    if_none_match: Optional[str] = Header(default=None),
     task_runner: TaskRunner = Depends(get_task_runner),
     api_recorder: ApiRecorder = Depends(get_api_recorder),
-) -> TaskResultResponse:
-    """获取任务执行状态与结果。"""
+) -> Response:
+    """获取任务执行状态与结果，已完成任务支持 If-None-Match 条件请求。"""
 
     endpoint = "api_task_result"
     _record_request(api_recorder=api_recorder, endpoint=endpoint, payload={"task_id": task_id})
@@ -596,6 +746,12 @@ def fetch_task_result(
         )
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(error)) from error
 
+    # 已完成任务的结果不再变化，轮询命中 ETag 时直接返回 304，跳过结果组装与编码。
+    etag: Optional[str] = None
+    if snapshot.status == "completed" and snapshot.outcome is not None:
+        etag = _weak_etag(token=snapshot.outcome.trace.trace_id)
+        if _etag_matches(if_none_match=if_none_match, etag=etag):
+            return _not_modified_response(api_recorder=api_recorder, endpoint=endpoint, etag=etag)
     try:
         if snapshot.status == "completed":
             outcome = snapshot.outcome
@@ -609,7 +765,8 @@ def fetch_task_result(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 )
                 raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=message)
-            result_payload = TaskResultPayload(
+            # 各字段均为流水线产出的已校验契约对象，model_construct 跳过重复校验。
+            result_payload = TaskResultPayload.model_construct(
                 profile=outcome.profile,
                 plan=outcome.plan,
                 prepared_table=outcome.prepared_table,
@@ -619,7 +776,7 @@ def fetch_task_result(
                 explanation=outcome.explanation,
                 trace=outcome.trace,
             )
-            response = TaskResultResponse(
+            response = TaskResultResponse.model_construct(
                 task_id=task_id,
                 status="completed",
                 result=result_payload,
@@ -667,7 +824,8 @@ def fetch_task_result(
         )
         raise
     _record_response(api_recorder=api_recorder, endpoint=endpoint, payload=response)
-    return response
+    headers = {"ETag": etag} if etag is not None else None
+    return _json_response(payload=response, headers=headers)
 
 
 @router.get("/api/task/stream")
@@ -676,12 +834,14 @@ async def stream_task(
     task_runner: TaskRunner = Depends(get_task_runner),
     api_recorder: ApiRecorder = Depends(get_api_recorder),
 ):
-    """通过 SSE 返回任务执行进度。"""
+    """通过 SSE 返回任务执行进度，首帧为当前状态快照，随后推送历史与增量事件。"""
 
     endpoint = "api_task_stream"
     _record_request(api_recorder=api_recorder, endpoint=endpoint, payload={"task_id": task_id})
     try:
         queue = await task_runner.subscribe(task_id=task_id)
+        # 订阅与快照在同一轮事件循环内完成，快照状态与随后回放的历史事件一致。
+        snapshot = task_runner.get_snapshot(task_id=task_id)
     except KeyError as error:
         _record_error(
             api_recorder=api_recorder,
@@ -692,14 +852,30 @@ async def stream_task(
         )
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(error)) from error
 
+    # 首帧推送当前状态，客户端连上即可知晓任务进度，无需再轮询 result 接口。
+    snapshot_payload = _SSE_SNAPSHOT_ADAPTER.dump_json({"task_id": task_id, "status": snapshot.status})
+    snapshot_frame = b"event: snapshot\ndata: " + snapshot_payload + b"\n\n"
+
     async def event_generator():
-        while True:
-            item = await queue.get()
-            if item is None:
-                yield "event: end\n\n"
-                break
-            payload = json.dumps(model_dump(item), ensure_ascii=False)
-            yield f"data: {payload}\n\n"
+        yield snapshot_frame
+        finished = False
+        while not finished:
+            items = [await queue.get()]
+            # 已就绪的事件合并为一次写出，突发进度时减少逐帧 send。
+            while True:
+                try:
+                    items.append(queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            frames: List[bytes] = []
+            for item in items:
+                if item is None:
+                    frames.append(_SSE_END_FRAME)
+                    finished = True
+                    break
+                # 事件由 pydantic-core 直接编码为 JSON 字节，帧以 bytes 拼接，StreamingResponse 无需再编码。
+                frames.append(b"data: " + _TASK_EVENT_ADAPTER.dump_json(item, by_alias=True) + b"\n\n")
+            yield b"".join(frames)
     return StreamingResponse(event_generator(), media_type="text/event-stream")
 @router.post("/api/transform/execute", response_model=TransformExecuteResponse)
 def execute_transform(
@@ -707,6 +883,7 @@ def execute_transform(
     dataset_store: DatasetStore = Depends(get_dataset_store),
     trace_store: TraceStore = Depends(get_trace_store),
     clock=Depends(get_clock),
+    agents: PipelineAgents = Depends(get_pipeline_agents),
     api_recorder: ApiRecorder = Depends(get_api_recorder),
 ) -> TransformExecuteResponse:
     """执行单个变换草案并返回准备表及输出表。"""
@@ -716,7 +893,6 @@ def execute_transform(
     try:
         dataset_path = _ensure_path(path_str=request.dataset_path)
         trace_recorder = _create_trace_recorder(clock=clock)
-        agents = get_pipeline_agents()
         context = AgentContext(
             task_id=request.task_id,
             dataset_id=request.dataset_id,
@@ -756,6 +932,13 @@ def execute_transform(
             output_table=artifacts.output_table,
             trace=trace,
         )
+    except FileNotFoundError as error:
+        # 时间窗内的缓存校验之后文件被删除，读取时才发现，仍按路径不存在返回 400。
+        raise _dataset_vanished(
+            api_recorder=api_recorder,
+            endpoint=endpoint,
+            path_str=request.dataset_path,
+        ) from error
     except HTTPException as error:
         _record_error(
             api_recorder=api_recorder,
@@ -782,6 +965,7 @@ def aggregate_transform(
     request: TransformAggregateRequest,
     dataset_store: DatasetStore = Depends(get_dataset_store),
     clock=Depends(get_clock),
+    agents: PipelineAgents = Depends(get_pipeline_agents),
     api_recorder: ApiRecorder = Depends(get_api_recorder),
 ) -> TransformAggregateResponse:
     """生成预处理表，支持基于计划或摘要的占位实现。"""
@@ -790,7 +974,6 @@ def aggregate_transform(
     _record_request(api_recorder=api_recorder, endpoint=endpoint, payload=request)
     try:
         dataset_path = _ensure_path(path_str=request.dataset_path)
-        agents = get_pipeline_agents()
         trace_recorder = _create_trace_recorder(clock=clock)
         context = AgentContext(
             task_id=request.task_id,
@@ -844,6 +1027,13 @@ def aggregate_transform(
                 transform_id=transform_id,
             )
         response = TransformAggregateResponse(prepared_table=prepared_table)
+    except FileNotFoundError as error:
+        # 时间窗内的缓存校验之后文件被删除，读取时才发现，仍按路径不存在返回 400。
+        raise _dataset_vanished(
+            api_recorder=api_recorder,
+            endpoint=endpoint,
+            path_str=request.dataset_path,
+        ) from error
     except HTTPException as error:
         _record_error(
             api_recorder=api_recorder,
@@ -870,6 +1060,7 @@ def recommend_chart(
     request: ChartRecommendRequest,
     trace_store: TraceStore = Depends(get_trace_store),
     clock=Depends(get_clock),
+    agents: PipelineAgents = Depends(get_pipeline_agents),
     api_recorder: ApiRecorder = Depends(get_api_recorder),
 ) -> ChartRecommendResponse:
     """根据计划推荐图表规范。"""
@@ -878,7 +1069,6 @@ def recommend_chart(
     _record_request(api_recorder=api_recorder, endpoint=endpoint, payload=request)
     try:
         trace_recorder = _create_trace_recorder(clock=clock)
-        agents = get_pipeline_agents()
         context = AgentContext(
             task_id=request.task_id,
             dataset_id=request.dataset_id,
@@ -974,11 +1164,11 @@ def export_contract_schemas(
         files: List[str] = []
         schemas: dict[str, object] = {}
         for schema_name, model in SCHEMA_EXPORT_MODELS.items():
-            schema_payload = model.model_json_schema()
+            schema_text = _contract_schema_text(model=model)
             target = schema_dir / f"{schema_name}.json"
-            target.write_text(json.dumps(schema_payload, ensure_ascii=False, indent=2), encoding="utf-8")
+            target.write_text(schema_text, encoding="utf-8")
             files.append(str(target))
-            schemas[schema_name] = schema_payload
+            schemas[schema_name] = json.loads(schema_text)
         response = SchemaExportResponse(files=files, schemas=schemas)
     except Exception as error:  # noqa: BLE001 - 统一兜底记录
         LOGGER.exception("Schema 导出失败", extra={"endpoint": endpoint})
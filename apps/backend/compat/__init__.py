@@ -4,7 +4,9 @@ from apps.backend.compat.pydantic import (
     BaseModel,
     ConfigDict,
     Field,
+    TypeAdapter,
     model_dump,
+    model_dump_json,
     model_validator,
 )
 
@@ -12,6 +14,8 @@ __all__ = [
     "BaseModel",
     "ConfigDict",
     "Field",
+    "TypeAdapter",
     "model_dump",
+    "model_dump_json",
     "model_validator",
 ]
@@ -5,7 +5,7 @@ from __future__ import annotations
 import json
 from typing import Any
 
-from pydantic import BaseModel, ConfigDict, Field, model_validator
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, model_validator
 
 
 def model_dump(payload: Any, **kwargs: Any) -> Any:
@@ -35,10 +35,22 @@ def model_dump(payload: Any, **kwargs: Any) -> Any:
     raise TypeError("无法序列化给定对象，需为 Pydantic 模型或基础类型。")
 
 
+def model_dump_json(payload: Any, **kwargs: Any) -> str:
+    """将 Pydantic v2 模型直接编码为 JSON 字符串，由 pydantic-core 完成编码，跳过中间字典。"""
+
+    if not hasattr(payload, "model_dump_json"):
+        raise TypeError("model_dump_json 仅支持 Pydantic 模型。")
+    if "by_alias" not in kwargs:
+        kwargs["by_alias"] = True
+    return payload.model_dump_json(**kwargs)
+
+
 __all__ = [
     "BaseModel",
     "Field",
     "ConfigDict",
+    "TypeAdapter",
     "model_validator",
     "model_dump",
+    "model_dump_json",
 ]
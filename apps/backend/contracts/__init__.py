@@ -26,6 +26,7 @@ from apps.backend.contracts.plan import (
     Plan,
     PlanAssumption,
     TransformDraft,
+    TransformSpec,
 )
 from apps.backend.contracts.task_event import TaskEvent
 from apps.backend.contracts.trace import SpanEvent, SpanMetrics, SpanSLO, TraceRecord, TraceSpan
@@ -64,6 +65,7 @@ __all__ = [
     "ChartChannelMapping",
     "ChartPlanItem",
     "TransformDraft",
+    "TransformSpec",
     "ExplainOutline",
     "PreparedTable",
     "PreparedTableStats",
@@ -90,9 +90,12 @@ class ChartAxis(VersionedContractModel):
 
 
 class ChartLayout(VersionedContractModel):
-    """布局配置，约束画布尺寸与主题。"""
+    """布局配置，约束画布尺寸与主题。
 
-    model_config = ConfigDict(extra="forbid")
+    布局对象不可变，默认布局可在多个 ChartSpec 间共享同一实例。
+    """
+
+    model_config = ConfigDict(extra="forbid", frozen=True)
 
     @classmethod
     def schema_name(cls) -> str:
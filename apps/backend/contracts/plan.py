@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
+from functools import lru_cache
 from typing import List, Literal, Optional
 from uuid import UUID, uuid4
 
@@ -10,6 +11,9 @@ from apps.backend.compat import ConfigDict, Field, model_validator
 
 from apps.backend.contracts.metadata import VersionedContractModel
 
+_RENDER_CACHE_MAXSIZE = 256
+"""变换代码渲染缓存容量，TransformSpec 不可变，可直接作为缓存键。"""
+
 
 def _ensure_utc(dt: datetime, field_name: str) -> None:
     """确保时间戳携带 UTC 时区信息。"""
@@ -69,9 +73,12 @@ class FieldPlanItem(VersionedContractModel):
 
 
 class ChartChannelMapping(VersionedContractModel):
-    """模板编码映射，描述字段如何绑定到视觉通道。"""
+    """模板编码映射，描述字段如何绑定到视觉通道。
 
-    model_config = ConfigDict(extra="forbid")
+    映射对象不可变，ChartSpec 可直接复用计划中的实例而无需逐个复制。
+    """
+
+    model_config = ConfigDict(extra="forbid", frozen=True)
 
     @classmethod
     def schema_name(cls) -> str:
@@ -125,6 +132,90 @@ class ChartPlanItem(VersionedContractModel):
         return self
 
 
+class TransformSpec(VersionedContractModel):
+    """模板化变换的结构化描述，执行端可按 kind 直接分派，无需编译源码。"""
+
+    model_config = ConfigDict(extra="forbid", frozen=True)
+
+    @classmethod
+    def schema_name(cls) -> str:
+        """返回变换描述契约名称。"""
+
+        return "transform_spec"
+
+    kind: Literal["groupby_sum", "passthrough"] = Field(
+        description="变换类型：按字段分组求和或原样返回。",
+    )
+    group_by: Optional[str] = Field(
+        default=None,
+        description="分组字段，groupby_sum 时必填。",
+        min_length=1,
+    )
+    measure: Optional[str] = Field(
+        default=None,
+        description="求和的度量字段，groupby_sum 时必填。",
+        min_length=1,
+    )
+    sort_by: Optional[str] = Field(
+        default=None,
+        description="结果排序字段，需为 group_by 或 measure 之一。",
+        min_length=1,
+    )
+    ascending: bool = Field(
+        default=True,
+        description="结果是否按升序排列。",
+    )
+
+    @model_validator(mode="after")
+    def ensure_fields(self) -> "TransformSpec":
+        """校验分组求和所需字段完整且排序字段合法。"""
+
+        if self.kind == "groupby_sum":
+            if self.group_by is None or self.measure is None:
+                raise ValueError("groupby_sum 需要同时提供 group_by 与 measure。")
+            if self.sort_by is not None and self.sort_by not in {self.group_by, self.measure}:
+                raise ValueError("sort_by 必须为 group_by 或 measure。")
+        return self
+
+
+@lru_cache(maxsize=_RENDER_CACHE_MAXSIZE)
+def render_transform_code(spec: TransformSpec) -> str:
+    """将结构化变换描述渲染为等价的 pandas 代码，执行端以此判定草案代码是否仍与描述一致。
+
+    分支只决定函数体尾部，先确定尾部再一次性拼接整段代码；分组后立即按指标或时间重新排序，
+    groupby 关闭键排序并仅保留出现过的类别，按指标排序时以分组键升序作为次序键，并列行顺序与键排序一致。
+    """
+
+    if spec.kind == "groupby_sum":
+        if spec.sort_by == spec.measure:
+            # 指标并列时按分组键升序排列，结果顺序不依赖 groupby 的分组出现顺序。
+            sort_line = (
+                "    grouped = grouped.sort_values(by=[grouped.columns[1], grouped.columns[0]], "
+                f"ascending=[{spec.ascending}, True])"
+            )
+        else:
+            sort_line = f"    grouped = grouped.sort_values(by=grouped.columns[0], ascending={spec.ascending})"
+        body_lines = [
+            f"    grouped = df.groupby('{spec.group_by}', as_index=False, sort=False, observed=True)"
+            f"['{spec.measure}'].sum()",
+            sort_line,
+            "    return grouped",
+        ]
+    else:
+        body_lines = ["    return df"]
+    return "\n".join(
+        [
+            "import pandas as pd",
+            "",
+            "def transform(df: pd.DataFrame) -> pd.DataFrame:",
+            "    \"\"\"根据推荐字段生成聚合结果。\"\"\"",
+            "    if df.empty:",
+            "        raise ValueError('输入数据不能为空')",
+            *body_lines,
+        ],
+    )
+
+
 class TransformDraft(VersionedContractModel):
     """计划中的数据变换草案。"""
 
@@ -141,6 +232,10 @@ class TransformDraft(VersionedContractModel):
     code: str = Field(description="可执行的代码片段。", min_length=1)
     output_table: str = Field(description="预期输出表的标识。", min_length=1)
     intent_summary: str = Field(description="代码对应的业务意图说明。", min_length=1)
+    spec: Optional[TransformSpec] = Field(
+        default=None,
+        description="与 code 等价的结构化描述；code 与其渲染结果一致时执行端直接分派，否则以 code 为准。",
+    )
 
     @model_validator(mode="before")
     @classmethod
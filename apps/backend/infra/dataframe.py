@@ -0,0 +1,63 @@
+"""数据帧相关依赖的延迟加载，进程内各 Agent 共享同一份模块引用。"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+_PD_MODULE: Optional[Any] = None
+_NP_MODULE: Optional[Any] = None
+
+
+def get_pandas() -> Any:
+    """延迟加载 pandas，避免在不支持环境中提前导入。
+
+    Returns
+    -------
+    Any
+        已导入的 pandas 模块，首次调用后直接返回缓存引用。
+    """
+
+    global _PD_MODULE
+    if _PD_MODULE is None:
+        import pandas as pd  # noqa: WPS433 - 延迟导入
+
+        _PD_MODULE = pd
+    return _PD_MODULE
+
+
+def get_numpy() -> Any:
+    """延迟加载 numpy，与 pandas 保持一致的导入时机。
+
+    Returns
+    -------
+    Any
+        已导入的 numpy 模块，首次调用后直接返回缓存引用。
+    """
+
+    global _NP_MODULE
+    if _NP_MODULE is None:
+        import numpy as np  # noqa: WPS433 - 延迟导入
+
+        _NP_MODULE = np
+    return _NP_MODULE
+
+
+def render_sample_rows(dataframe: Any, limit: int) -> List[Dict[str, str]]:
+    """按列整体转换为字符串再生成行字典，避免 iterrows 为每行装箱 Series。
+
+    扫描与变换 Agent 共用此函数，同一份 CSV 在画像样本与准备表样本中渲染结果一致。
+    样本格式与逐行 iterrows 后 str() 一致：iterrows 先把各列统一为行内公共类型，全数值表中的整数列
+    因此渲染为 1.0，这里先做同样的统一；astype(str) 会把仅含零点的 datetime 列渲染为 YYYY-MM-DD，
+    datetime 列仍逐值 str()，保持 YYYY-MM-DD 00:00:00 的样本格式。
+    """
+
+    head = dataframe.head(limit)
+    # to_numpy 与 iterrows 使用同一套公共类型推断，样本行数很少，额外的二维数组开销可忽略。
+    common_dtype = head.to_numpy().dtype
+    if common_dtype.kind in "iufc":
+        head = head.astype(common_dtype)
+    rendered = head.astype(str)
+    for column, dtype in head.dtypes.items():
+        if dtype.kind == "M":
+            rendered[column] = head[column].map(str)
+    return rendered.to_dict(orient="records")
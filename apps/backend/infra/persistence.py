@@ -3,11 +3,15 @@
 from __future__ import annotations
 
 import json
+import logging
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Iterable
 
 from apps.backend.compat import model_dump
+from apps.backend.infra.write_behind import WriteBehindWorker
+
+LOGGER = logging.getLogger(__name__)
 
 MASK_TOKEN = "***MASKED***"
 
@@ -62,30 +66,49 @@ class ApiRecorder:
         if direction not in {"request", "response"}:
             raise ValueError("direction 仅支持 request 或 response。")
         path = self._build_target_path(endpoint=endpoint, direction=direction)
-        normalized = self._to_serializable(payload=payload)
-        masked = self._mask_payload(payload=normalized)
-        content = self._serialize_with_limit(payload=masked)
-        path.write_text(content, encoding="utf-8")
+        self._write(path=path, payload=payload)
         return path
 
     def record_error(self, endpoint: str, payload: Any) -> Path:
         """落盘错误结构，保持 request/response 同步可回放。"""
 
         path = self._build_target_path(endpoint=endpoint, direction="error")
+        self._write(path=path, payload=payload)
+        return path
+
+    def flush(self) -> None:
+        """同步落盘无需等待，保持与队列落盘器一致的接口。"""
+
+    def _write(self, path: Path, payload: Any) -> None:
+        """确保目录存在后写入目标文件。"""
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._write_file(path=path, payload=payload)
+
+    def _write_file(self, path: Path, payload: Any) -> None:
+        """序列化、脱敏后写入目标文件，调用方负责目录已存在。"""
+
+        self._write_content(path=path, content=self._render(payload=payload))
+
+    def _render(self, payload: Any) -> str:
+        """将 payload 转换、脱敏并序列化为落盘文本。"""
+
         normalized = self._to_serializable(payload=payload)
         masked = self._mask_payload(payload=normalized)
-        content = self._serialize_with_limit(payload=masked)
+        return self._serialize_with_limit(payload=masked)
+
+    @staticmethod
+    def _write_content(path: Path, content: str) -> None:
+        """将已序列化的文本写入目标文件。"""
+
         path.write_text(content, encoding="utf-8")
-        return path
 
     def _build_target_path(self, endpoint: str, direction: str) -> Path:
-        """生成落盘路径。"""
+        """生成落盘路径，仅做路径计算，目录由写盘阶段创建。"""
 
         timestamp = datetime.now(tz=timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
         safe_endpoint = endpoint.strip("/").replace("/", "__") or "root"
-        target_dir = self._base_path / safe_endpoint
-        target_dir.mkdir(parents=True, exist_ok=True)
-        return target_dir / f"{timestamp}_{direction}.json"
+        return self._base_path / safe_endpoint / f"{timestamp}_{direction}.json"
 
     @staticmethod
     def _to_serializable(payload: Any) -> Any:
@@ -138,3 +161,65 @@ class ApiRecorder:
             "message": "payload 超过大小门限，已被截断，请参考上游日志或拆分请求。",
         }
         return json.dumps(fallback, ensure_ascii=False, indent=2)
+
+
+class QueuedApiRecorder(ApiRecorder):
+    """在调用方线程确定落盘路径，序列化、脱敏与写盘交给单个后台线程，请求路径不再承担落盘开销。"""
+
+    def __init__(
+        self,
+        base_path: Path,
+        *,
+        max_bytes: int = 512_000,
+        masked_keys: Iterable[str] | None = None,
+    ) -> None:
+        """初始化落盘器并启动后台写盘线程。
+
+        Parameters
+        ----------
+        base_path: Path
+            存放落盘文件的根目录。
+        max_bytes: int
+            单个 JSON 文件允许的最大字节数，超过时进行截断提示。
+        masked_keys: Iterable[str] | None
+            需要掩码的敏感字段名称集合。
+        """
+
+        super().__init__(base_path, max_bytes=max_bytes, masked_keys=masked_keys)
+        self._writer = WriteBehindWorker(name="api-recorder", handler=self._write_batch)
+
+    def flush(self) -> None:
+        """阻塞等待已入队的记录全部写盘。"""
+
+        self._writer.flush()
+
+    def close(self) -> None:
+        """写完已入队的记录并停止后台写盘线程，之后不可再记录。"""
+
+        self._writer.close()
+
+    def _write(self, path: Path, payload: Any) -> None:
+        """入队即返回，路径时间戳已在调用时确定。
+
+        响应模型每次请求新建、之后不再修改，可直接入队；字典 payload 浅拷贝一层，调用方随后增删顶层键
+        不影响落盘内容，嵌套值入队后不得再修改。
+        """
+
+        if isinstance(payload, dict):
+            payload = dict(payload)
+        self._writer.submit((path, payload))
+
+    def _write_batch(self, batch: list[tuple[Path, Any]]) -> None:
+        """后台线程批量序列化并写盘，单条失败只记日志，不影响后续记录。"""
+
+        # 同一批次内的端点目录只创建一次，避免逐条 mkdir 系统调用。
+        for target_dir in {path.parent for path, _ in batch}:
+            try:
+                target_dir.mkdir(parents=True, exist_ok=True)
+            except OSError:
+                LOGGER.exception("API 落盘目录创建失败", extra={"path": str(target_dir)})
+        for path, payload in batch:
+            try:
+                self._write_content(path=path, content=self._render(payload=payload))
+            except Exception:  # noqa: BLE001 - 单条失败不影响同批其他记录
+                LOGGER.exception("API 落盘失败", extra={"path": str(path)})
@@ -0,0 +1,142 @@
+"""单线程后台写入队列，供落盘组件把阻塞 IO 移出请求路径。"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, List, Optional
+
+LOGGER = logging.getLogger(__name__)
+
+_DRAIN_BATCH_SIZE = 64
+"""后台线程单次取出的最大条目数。"""
+
+_EXIT_FLUSH_TIMEOUT_SECONDS = 10.0
+"""解释器退出时等待队列写完的上限，避免处理函数卡住导致进程无法退出。"""
+
+_STOP = object()
+"""关闭哨兵，后台线程处理完其之前入队的条目后退出。"""
+
+
+class WriteBehindWorker:
+    """调用方入队即返回，单个守护线程按批交给处理函数，flush 等待队列清空，close 停止线程。
+
+    条目入队后由后台线程读取，调用方提交后不得再修改该对象，否则落盘内容会反映入队之后的修改。
+    """
+
+    def __init__(self, *, name: str, handler: Callable[[List[Any]], None]) -> None:
+        """初始化队列并启动后台线程。
+
+        Parameters
+        ----------
+        name: str
+            后台线程名称，便于排查。
+        handler: Callable[[List[Any]], None]
+            批量处理函数，单条失败应自行记录，抛出的异常只记日志。
+        """
+
+        self._handler = handler
+        # queue.Queue 线程安全，同步路由（线程池）与事件循环中的调用方均可直接入队。
+        self._pending: queue.Queue[Any] = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._drain, name=name, daemon=True)
+        self._thread.start()
+        # 守护线程随解释器退出被直接终止；未经 app lifespan 的退出（脚本、未用 with 的 TestClient）
+        # 也需写完已入队条目，atexit 回调执行时守护线程仍在运行。
+        atexit.register(self._flush_at_exit)
+
+    def submit(self, item: Any) -> None:
+        """入队待写条目，不等待写入完成；关闭后入队立即失败。"""
+
+        if self._closed:
+            raise RuntimeError(f"后台写入队列 {self._thread.name} 已关闭。")
+        self._pending.put_nowait(item)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """阻塞等待已入队条目全部处理完毕。
+
+        Parameters
+        ----------
+        timeout: Optional[float]
+            最长等待秒数，None 表示一直等待。
+
+        Returns
+        -------
+        bool
+            队列是否已清空；超时返回 False。
+        """
+
+        if timeout is None:
+            self._pending.join()
+            return True
+        deadline = time.monotonic() + timeout
+        # 与 Queue.join 相同的条件变量等待，只是加上截止时间。
+        with self._pending.all_tasks_done:
+            while self._pending.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._pending.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """写完已入队条目后停止后台线程，并注销退出回调；重复调用无副作用。
+
+        Parameters
+        ----------
+        timeout: Optional[float]
+            等待线程退出的最长秒数，None 表示一直等待。
+
+        Returns
+        -------
+        bool
+            后台线程是否已退出；超时返回 False。
+        """
+
+        if not self._closed:
+            self._closed = True
+            atexit.unregister(self._flush_at_exit)
+            self._pending.put_nowait(_STOP)
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    def _flush_at_exit(self) -> None:
+        """解释器退出前在有限时间内写完队列，超时只记日志。"""
+
+        if not self.flush(timeout=_EXIT_FLUSH_TIMEOUT_SECONDS):
+            LOGGER.warning(
+                "退出时后台写入未完成",
+                extra={"thread": self._thread.name, "pending": self._pending.unfinished_tasks},
+            )
+
+    def _drain(self) -> None:
+        """后台线程循环处理批次，异常不终止线程，取到关闭哨兵后退出。"""
+
+        while True:
+            batch = self._take_batch()
+            stopping = batch[-1] is _STOP
+            items = batch[:-1] if stopping else batch
+            try:
+                if items:
+                    self._handler(items)
+            except Exception:  # noqa: BLE001 - 后台线程需存活以处理后续条目
+                LOGGER.exception("后台写入失败", extra={"thread": self._thread.name})
+            finally:
+                for _ in batch:
+                    self._pending.task_done()
+            if stopping:
+                return
+
+    def _take_batch(self) -> List[Any]:
+        """阻塞取出首条，再非阻塞取走已排队的条目，不额外等待以免拖慢写入；关闭哨兵总在批次末尾。"""
+
+        batch = [self._pending.get()]
+        while batch[-1] is not _STOP and len(batch) < _DRAIN_BATCH_SIZE:
+            try:
+                batch.append(self._pending.get_nowait())
+            except queue.Empty:
+                break
+        return batch
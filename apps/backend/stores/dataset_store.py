@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Dict
+from typing import Dict, Optional
 
 from apps.backend.contracts.dataset_profile import DatasetProfile
 
@@ -27,6 +27,22 @@ class DatasetStore:
 
         self._profiles[dataset_id] = profile
 
+    def get(self, dataset_id: str) -> Optional[DatasetProfile]:
+        """读取画像，不存在时返回 None。
+
+        Parameters
+        ----------
+        dataset_id: str
+            数据集标识。
+
+        Returns
+        -------
+        Optional[DatasetProfile]
+            已缓存的画像对象，未扫描过时为 None。
+        """
+
+        return self._profiles.get(dataset_id)
+
     def require(self, dataset_id: str) -> DatasetProfile:
         """读取画像，不存在时立即失败。
 
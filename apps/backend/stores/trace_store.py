@@ -3,12 +3,20 @@
 from __future__ import annotations
 
 import json
+import logging
+import threading
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
 
 from apps.backend.contracts.trace import TraceRecord
-from apps.backend.compat import model_dump
+from apps.backend.compat import model_dump, model_dump_json
+from apps.backend.infra.write_behind import WriteBehindWorker
+
+LOGGER = logging.getLogger(__name__)
+
+_JSON_CACHE_MAXSIZE = 64
+"""Trace JSON 编码缓存容量，按最近使用淘汰，只保留热点 Trace 的编码副本。"""
 
 
 def _model_dump(payload: TraceRecord) -> dict:
@@ -30,31 +38,102 @@ class TraceStore:
     """以 task_id 为键缓存 TraceRecord，并落盘 JSON。"""
 
     base_path: Path
+    write_behind: bool = False
     _records: Dict[str, TraceRecord] = field(default_factory=dict)
+    _json_cache: Dict[str, Tuple[TraceRecord, bytes]] = field(default_factory=dict)
+    _json_cache_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _writer: Optional[WriteBehindWorker] = field(default=None, init=False, repr=False)
 
     def __post_init__(self) -> None:
-        """确保落盘目录存在。"""
+        """确保落盘目录存在，启用 write_behind 时启动后台写盘线程。"""
 
         self.base_path.mkdir(parents=True, exist_ok=True)
+        if self.write_behind:
+            self._writer = WriteBehindWorker(name="trace-store", handler=self._persist_batch)
 
     def save(self, trace: TraceRecord) -> None:
-        """写入 Trace 并落盘。"""
+        """写入 Trace 并落盘；write_behind 模式下内存立即可读，序列化与写文件均由后台线程完成。
+
+        与 dump_json 相同，Trace 保存后不得原地修改，入队的模型即为落盘内容。
+        """
 
         self._records[trace.task_id] = trace
-        payload = _model_dump(payload=trace)
-        path = self.base_path / f"{trace.task_id}.json"
-        path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+        with self._json_cache_lock:
+            self._json_cache.pop(trace.task_id, None)
+        if self._writer is not None:
+            self._writer.submit((trace.task_id, trace))
+            return
+        self._persist(task_id=trace.task_id, trace=trace)
 
-    def require(self, task_id: str) -> TraceRecord:
-        """根据 task_id 获取 Trace，若不存在立即失败。"""
+    def flush(self) -> None:
+        """阻塞等待后台队列中的 Trace 全部落盘，同步模式下无需等待。"""
+
+        if self._writer is not None:
+            self._writer.flush()
+
+    def close(self) -> None:
+        """写完已入队的 Trace 并停止后台写盘线程，同步模式下无需处理。"""
+
+        if self._writer is not None:
+            self._writer.close()
+
+    def _persist(self, task_id: str, trace: TraceRecord) -> None:
+        """将 Trace 序列化并写入 JSON 文件。"""
+
+        path = self.base_path / f"{task_id}.json"
+        content = json.dumps(_model_dump(payload=trace), ensure_ascii=False, indent=2)
+        path.write_text(content, encoding="utf-8")
+
+    def _persist_batch(self, batch: List[Tuple[str, TraceRecord]]) -> None:
+        """后台线程按入队顺序序列化并落盘，同一 task_id 以最后一次保存为准。"""
 
-        if task_id in self._records:
-            return self._records[task_id]
+        for task_id, trace in batch:
+            try:
+                self._persist(task_id=task_id, trace=trace)
+            except Exception:  # noqa: BLE001 - 单条失败不影响同批其他 Trace
+                LOGGER.exception("Trace 落盘失败", extra={"task_id": task_id})
+
+    def get(self, task_id: str) -> Optional[TraceRecord]:
+        """根据 task_id 获取 Trace，内存与磁盘均不存在时返回 None，供未命中常见的路径直接分支。"""
+
+        trace = self._records.get(task_id)
+        if trace is not None:
+            return trace
         path = self.base_path / f"{task_id}.json"
         if not path.exists():
-            message = f"task_id={task_id} 未找到 Trace 记录。"
-            raise KeyError(message)
+            return None
         payload = json.loads(path.read_text(encoding="utf-8"))
         trace = _model_validate(payload=payload)
         self._records[task_id] = trace
         return trace
+
+    def require(self, task_id: str) -> TraceRecord:
+        """根据 task_id 获取 Trace，若不存在立即失败。"""
+
+        trace = self.get(task_id=task_id)
+        if trace is None:
+            message = f"task_id={task_id} 未找到 Trace 记录。"
+            raise KeyError(message)
+        return trace
+
+    def dump_json(self, trace: TraceRecord) -> bytes:
+        """返回给定 Trace 的 JSON 字节，按 Trace 对象身份缓存编码结果。
+
+        缓存条目与编码所用的 Trace 对象成对存放，命中需为同一对象；编码期间并发 save 写入的旧条目
+        不会被新 Trace 命中。TraceRecord 本身可变，缓存不感知原地修改：调用方在 save 之后不得修改
+        该对象，需要变更时应 model_copy 出新对象并重新 save，缓存随之失效。缓存按最近使用保留
+        至多 _JSON_CACHE_MAXSIZE 条，冷门 Trace 只在 _records 中保留模型本身。
+        """
+
+        with self._json_cache_lock:
+            cached = self._json_cache.pop(trace.task_id, None)
+            if cached is not None and cached[0] is trace:
+                # 重新插入到末尾，字典插入顺序即最近使用顺序。
+                self._json_cache[trace.task_id] = cached
+                return cached[1]
+        encoded = model_dump_json(trace).encode("utf-8")
+        with self._json_cache_lock:
+            self._json_cache[trace.task_id] = (trace, encoded)
+            if len(self._json_cache) > _JSON_CACHE_MAXSIZE:
+                self._json_cache.pop(next(iter(self._json_cache)))
+        return encoded
@@ -3,8 +3,17 @@
 from __future__ import annotations
 
 import json
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
 
-from apps.backend.infra.persistence import ApiRecorder, MASK_TOKEN
+import pytest
+
+from apps.backend.infra import write_behind
+from apps.backend.infra.persistence import ApiRecorder, MASK_TOKEN, QueuedApiRecorder
+
+_REPO_ROOT = Path(__file__).resolve().parents[3]
 
 
 def test_api_recorder_masks_sensitive_fields(tmp_path) -> None:
@@ -31,3 +40,100 @@ def test_api_recorder_truncates_large_payload(tmp_path) -> None:
     payload = json.loads(files[0].read_text(encoding="utf-8"))
     assert payload["truncated"] is True
     assert payload["original_size"] > payload["max_bytes"]
+
+
+def test_queued_api_recorder_writes_in_background(tmp_path) -> None:
+    """队列落盘器应立即返回路径，flush 后文件内容与同步落盘一致。"""
+
+    recorder = QueuedApiRecorder(base_path=tmp_path)
+    path = recorder.record(endpoint="queued", direction="request", payload={"dataset_path": "/secret/data.csv"})
+    recorder.record_error(endpoint="queued", payload={"error_type": "KeyError"})
+    recorder.flush()
+    payload = json.loads(path.read_text(encoding="utf-8"))
+    assert payload["dataset_path"] == MASK_TOKEN
+    assert list((tmp_path / "queued").glob("*_error.json")), "错误文件未落盘。"
+    recorder.close()
+
+
+def test_queued_api_recorder_snapshots_top_level_keys_at_record_time(tmp_path) -> None:
+    """记录后增删或替换字典 payload 的顶层键不应影响落盘内容。"""
+
+    recorder = QueuedApiRecorder(base_path=tmp_path)
+    payload = {"items": [1]}
+    path = recorder.record(endpoint="queued", direction="request", payload=payload)
+    payload["items"] = [1, 2]
+    payload["extra"] = True
+    recorder.close()
+    assert json.loads(path.read_text(encoding="utf-8")) == {"items": [1]}
+
+
+def test_write_behind_close_stops_thread_and_unregisters_exit_hook(monkeypatch) -> None:
+    """close 写完已入队条目后停止线程并注销 atexit 回调，之后入队立即失败。"""
+
+    unregistered = []
+    monkeypatch.setattr(write_behind.atexit, "unregister", unregistered.append)
+    handled = []
+    worker = write_behind.WriteBehindWorker(name="close-test", handler=handled.extend)
+    worker.submit(1)
+    worker.submit(2)
+    assert worker.close(timeout=5) is True
+    assert handled == [1, 2]
+    assert unregistered == [worker._flush_at_exit]
+    with pytest.raises(RuntimeError):
+        worker.submit(3)
+
+
+def test_write_behind_flushes_at_interpreter_exit(tmp_path) -> None:
+    """未经 app lifespan 直接退出解释器时，已入队的 API 日志与 Trace 仍应落盘。"""
+
+    script = textwrap.dedent(
+        f"""
+        import sys
+        import time
+        from datetime import datetime, timezone
+        from pathlib import Path
+
+        sys.path.insert(0, {str(_REPO_ROOT)!r})
+        from apps.backend.contracts.trace import SpanMetrics, SpanSLO, TraceRecord, TraceSpan
+        from apps.backend.infra.persistence import ApiRecorder, QueuedApiRecorder
+        from apps.backend.stores import TraceStore
+
+        original_write_content = ApiRecorder._write_content
+
+        def slow_write_content(path, content):
+            time.sleep(0.2)
+            original_write_content(path=path, content=content)
+
+        ApiRecorder._write_content = staticmethod(slow_write_content)
+        base = Path({str(tmp_path)!r})
+        recorder = QueuedApiRecorder(base_path=base / "api_logs")
+        for _ in range(3):
+            recorder.record(endpoint="exit", direction="request", payload={{"value": 1}})
+        now = datetime.now(timezone.utc)
+        span = TraceSpan(
+            span_id="span",
+            parent_span_id=None,
+            operation="data.scan",
+            agent_name="scanner",
+            status="success",
+            started_at=now,
+            slo=SpanSLO(max_duration_ms=1000, max_retries=0, failure_isolation_required=True),
+            metrics=SpanMetrics(duration_ms=1, retry_count=0, rows_in=1, rows_out=1),
+            model_name=None,
+            prompt_version=None,
+            dataset_hash="hash",
+            schema_version="1.0",
+            abort_reason=None,
+            error_class=None,
+            fallback_path=None,
+            sse_seq=1,
+            events=[],
+        )
+        store = TraceStore(base_path=base / "traces", write_behind=True)
+        store.save(trace=TraceRecord(trace_id="t", task_id="exit-task", dataset_id="d", created_at=now, spans=[span]))
+        """,
+    )
+    completed = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, timeout=60)
+    assert completed.returncode == 0, completed.stderr
+    assert len(list((tmp_path / "api_logs" / "exit").glob("*_request.json"))) == 3
+    assert (tmp_path / "traces" / "exit-task.json").exists()
@@ -8,6 +8,7 @@ from pathlib import Path
 
 import pytest
 
+from apps.backend.api import routes
 from apps.backend.contracts.chart_spec import ChartA11y, ChartLayout, ChartSpec
 from apps.backend.contracts.chart_template import ChartEncoding, ChartTemplate
 from apps.backend.contracts.dataset_profile import DatasetProfile, DatasetSampling, DatasetSummary
@@ -22,6 +23,7 @@ from apps.backend.contracts.plan import (
     Plan,
     PlanAssumption,
     TransformDraft,
+    TransformSpec,
 )
 from apps.backend.contracts.transform import (
     OutputMetrics,
@@ -35,6 +37,7 @@ from apps.backend.contracts.transform import (
 )
 from apps.backend.contracts.task_event import TaskEvent
 from apps.backend.contracts.trace import SpanEvent, SpanMetrics, SpanSLO, TraceRecord, TraceSpan
+from apps.backend.infra.persistence import ApiRecorder
 from pydantic import ValidationError
 
 
@@ -372,6 +375,17 @@ def test_chart_template_required_channels_unique() -> None:
         )
 
 
+def test_transform_spec_requires_groupby_fields() -> None:
+    """分组求和缺少度量字段或排序字段非法时应触发异常。"""
+
+    with pytest.raises(ValidationError):
+        TransformSpec(kind="groupby_sum", group_by="store")
+    with pytest.raises(ValidationError):
+        TransformSpec(kind="groupby_sum", group_by="store", measure="sales", sort_by="date")
+    spec = TransformSpec(kind="groupby_sum", group_by="store", measure="sales", sort_by="sales")
+    assert spec.ascending is True
+
+
 def test_dataset_profile_success() -> None:
     """构造一份合法的画像模型确保校验通过。"""
 
@@ -398,3 +412,17 @@ def test_dataset_profile_success() -> None:
         profiling_notes=["扫描成功"],
     )
     assert profile.summary.dataset_id == "ds_1"
+
+
+def test_schema_export_returns_independent_schema_copies(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """导出接口每次返回新解析的 Schema，修改一次响应不影响后续导出。"""
+
+    monkeypatch.chdir(tmp_path)
+    api_recorder = ApiRecorder(base_path=tmp_path / "api_logs")
+    schema_name = Plan.schema_name()
+    first = routes.export_contract_schemas(api_recorder=api_recorder)
+    first.schemas[schema_name]["title"] = "mutated"
+    second = routes.export_contract_schemas(api_recorder=api_recorder)
+    assert second.schemas[schema_name] == Plan.model_json_schema()
+    schema_text = (tmp_path / "var" / "schemas" / f"{schema_name}.json").read_text(encoding="utf-8")
+    assert json.loads(schema_text) == Plan.model_json_schema()
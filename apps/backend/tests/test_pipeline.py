@@ -3,24 +3,36 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import json
+import os
 from pathlib import Path
 from typing import List, Tuple
 
+import pandas as pd
 import pytest
 from fastapi.testclient import TestClient
 
+from apps.backend.api import routes
 from apps.backend.api.app import create_app
-from apps.backend.api.dependencies import get_task_runner
+from apps.backend.api.dependencies import get_api_recorder, get_task_runner, get_trace_store
+from apps.backend.agents import data_scan
 from apps.backend.agents import (
     AgentContext,
     DatasetScannerAgent,
     ExplanationAgent,
+    PlanPayload,
     PlanRefinementAgent,
+    ScanPayload,
     TransformArtifacts,
     TransformExecutionAgent,
+    TransformPayload,
     ChartRecommendationAgent,
 )
-from apps.backend.compat import model_dump
+from apps.backend.compat import model_dump, model_dump_json
+from apps.backend.contracts.dataset_profile import DatasetProfile
+from apps.backend.contracts.plan import Plan
+from apps.backend.contracts.transform import OutputTable
 from apps.backend.infra.clock import UtcClock
 from apps.backend.infra.persistence import ApiRecorder
 from apps.backend.infra.tracing import TraceRecorder
@@ -53,6 +65,57 @@ def _build_agents() -> PipelineAgents:
     )
 
 
+def _scan_file(dataset_path: Path, dataset_id: str) -> Tuple[AgentContext, DatasetProfile]:
+    """对已写入的数据文件执行扫描 Agent，返回上下文与画像。"""
+
+    clock = UtcClock()
+    context = AgentContext(
+        task_id=f"task_{dataset_id}",
+        dataset_id=dataset_id,
+        trace_recorder=TraceRecorder(clock=clock),
+        clock=clock,
+    )
+    profile = DatasetScannerAgent().run(
+        context=context,
+        payload=ScanPayload(
+            dataset_id=dataset_id,
+            dataset_name="Pipeline Dataset",
+            dataset_version="v1",
+            path=dataset_path,
+            sample_limit=3,
+        ),
+    ).output
+    return context, profile
+
+
+def _scan_and_plan(dataset_path: Path, dataset_id: str, user_goal: str) -> Tuple[AgentContext, DatasetProfile, Plan]:
+    """写入样例数据并依次执行扫描与计划 Agent，返回上下文、画像与计划。"""
+
+    _create_sample_dataset(path=dataset_path)
+    context, profile = _scan_file(dataset_path=dataset_path, dataset_id=dataset_id)
+    plan = PlanRefinementAgent().run(
+        context=context,
+        payload=PlanPayload(dataset_profile=profile, user_goal=user_goal),
+    ).output
+    return context, profile, plan
+
+
+def _execute_transform_code(dataset_path: Path, dataset_id: str, code_lines: List[str]) -> OutputTable:
+    """以给定代码替换首个草案（不带结构化描述）并执行变换，返回输出表。"""
+
+    context, profile, plan = _scan_and_plan(dataset_path=dataset_path, dataset_id=dataset_id, user_goal="查看日期")
+    draft = plan.transform_drafts[0].model_copy(update={"code": "\n".join(code_lines), "spec": None})
+    return TransformExecutionAgent().run(
+        context=context,
+        payload=TransformPayload(
+            dataset_profile=profile,
+            plan=plan.model_copy(update={"transform_drafts": [draft]}),
+            dataset_path=dataset_path,
+            sample_limit=3,
+        ),
+    ).output.output_table
+
+
 async def _run_task_and_wait(runner: TaskRunner, config: PipelineConfig) -> Tuple[str, List[dict]]:
     """提交任务并消费完所有事件，返回 task_id 与事件记录。"""
 
@@ -104,6 +167,260 @@ def test_execute_pipeline_returns_outcome(tmp_path: Path) -> None:
     assert outcome.trace.task_id == config.task_id
 
 
+def test_scanner_reuses_profile_for_unchanged_file(tmp_path: Path) -> None:
+    """同一文件版本重复扫描应复用画像，文件变化后应重新扫描。"""
+
+    dataset_path = tmp_path / "cached.csv"
+    _create_sample_dataset(path=dataset_path)
+    _, first = _scan_file(dataset_path=dataset_path, dataset_id="dataset_first")
+    original_fields = [field.model_copy(deep=True) for field in first.summary.fields]
+    original_rows = [dict(row) for row in first.summary.sample_rows]
+    # 调用方修改画像不应污染缓存，后续扫描仍得到原始结果。
+    first.summary.fields[0].sample_values.append("mutated")
+    first.summary.sample_rows[0]["store"] = "mutated"
+    _, second = _scan_file(dataset_path=dataset_path, dataset_id="dataset_second")
+    assert second.summary.fields == original_fields
+    assert second.summary.sample_rows == original_rows
+    assert second.dataset_id == "dataset_second"
+    assert second.summary.dataset_id == "dataset_second"
+    assert second.hash_digest == first.hash_digest
+    with dataset_path.open("a", encoding="utf-8") as handle:
+        handle.write("C,30,2024-01-04\n")
+    _, third = _scan_file(dataset_path=dataset_path, dataset_id="dataset_third")
+    assert third.row_count == first.row_count + 1
+    assert third.hash_digest != first.hash_digest
+
+
+def test_scanner_top_categories_keep_value_counts_tie_order(tmp_path: Path) -> None:
+    """高频类别与频次应与 value_counts().head(10) 完全一致，包括并列频次的先后。"""
+
+    dataset_path = tmp_path / "ties.csv"
+    labels = ["k11", "k03", "k07", "k00", "k09", "k01", "k05", "k10", "k02", "k08", "k04", "k06"]
+    rows = labels + ["k07", "k01", "k04"]
+    dataset_path.write_text("label\n" + "\n".join(rows) + "\n", encoding="utf-8")
+    _, profile = _scan_file(dataset_path=dataset_path, dataset_id="dataset_ties")
+    value_range = profile.summary.fields[0].value_range
+    expected = pd.read_csv(dataset_path)["label"].value_counts().head(10)
+    assert value_range.categories == expected.index.tolist()
+    assert value_range.top_k_frequencies == expected.tolist()
+
+
+def test_scanner_entropy_of_constant_column_is_positive_zero(tmp_path: Path) -> None:
+    """单值列的信息熵应为 0.0，不能以 -0.0 出现在画像中。"""
+
+    dataset_path = tmp_path / "constant.csv"
+    dataset_path.write_text("label\nA\nA\nA\n", encoding="utf-8")
+    _, profile = _scan_file(dataset_path=dataset_path, dataset_id="dataset_constant")
+    entropy = profile.summary.fields[0].statistics.entropy
+    assert entropy == 0.0
+    assert str(entropy) == "0.0"
+
+
+def test_scanner_parallel_field_schemas_match_serial(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """宽表走线程池与窄表逐列计算得到相同的字段画像。"""
+
+    dataset_path = tmp_path / "parallel.csv"
+    _create_sample_dataset(path=dataset_path)
+    _, serial = _scan_file(dataset_path=dataset_path, dataset_id="dataset_serial")
+    monkeypatch.setattr(data_scan, "_PARALLEL_COLUMN_THRESHOLD", 1)
+    monkeypatch.setattr(data_scan, "_SCAN_CACHE", {})
+    _, parallel = _scan_file(dataset_path=dataset_path, dataset_id="dataset_parallel")
+    assert parallel.summary.fields == serial.summary.fields
+
+
+def test_scanner_skips_cache_when_file_changes_during_scan(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """扫描期间文件被改写时结果不进入缓存，即使文件随后恢复原元数据也会重新扫描。"""
+
+    dataset_path = tmp_path / "changing.csv"
+    _create_sample_dataset(path=dataset_path)
+    original_content = dataset_path.read_bytes()
+    original_stat = dataset_path.stat()
+    original_file_digest = hashlib.file_digest
+    digests: List[str] = []
+
+    def _file_digest_with_concurrent_write(file_handle, digest):
+        if not digests:
+            with dataset_path.open("a", encoding="utf-8") as handle:
+                handle.write("C,30,2024-01-04\n")
+        digests.append(digest)
+        return original_file_digest(file_handle, digest)
+
+    monkeypatch.setattr(hashlib, "file_digest", _file_digest_with_concurrent_write)
+    _, first = _scan_file(dataset_path=dataset_path, dataset_id="dataset_changing")
+    assert first.row_count == 3
+    # 恢复为读取前的内容与元数据，若首次结果写入了缓存，此时会命中旧键。
+    dataset_path.write_bytes(original_content)
+    os.utime(dataset_path, ns=(original_stat.st_atime_ns, original_stat.st_mtime_ns))
+    _scan_file(dataset_path=dataset_path, dataset_id="dataset_changing")
+    assert len(digests) == 2
+    _scan_file(dataset_path=dataset_path, dataset_id="dataset_changing")
+    assert len(digests) == 2
+
+
+def test_scanner_sample_rows_match_transform_rendering(tmp_path: Path) -> None:
+    """画像样本与准备表样本共用同一渲染路径，全数值表的整数列同样显示为 10.0。"""
+
+    dataset_path = tmp_path / "numeric_scan.csv"
+    dataset_path.write_text("sales,ratio\n10,2.5\n25,6.25\n", encoding="utf-8")
+    context, profile = _scan_file(dataset_path=dataset_path, dataset_id="dataset_numeric_scan")
+    assert profile.summary.sample_rows[0] == {"sales": "10.0", "ratio": "2.5"}
+    plan = PlanRefinementAgent().run(
+        context=context,
+        payload=PlanPayload(dataset_profile=profile, user_goal="查看销售"),
+    ).output
+    draft = plan.transform_drafts[0].model_copy(update={"code": "def transform(df):\n    return df", "spec": None})
+    prepared_table = TransformExecutionAgent().run(
+        context=context,
+        payload=TransformPayload(
+            dataset_profile=profile,
+            plan=plan.model_copy(update={"transform_drafts": [draft]}),
+            dataset_path=dataset_path,
+            sample_limit=3,
+        ),
+    ).output.prepared_table
+    assert prepared_table.sample.rows == profile.summary.sample_rows
+
+
+def test_transform_spec_matches_generated_code(tmp_path: Path) -> None:
+    """结构化变换分派应与执行计划生成的代码得到相同结果。"""
+
+    dataset_path = tmp_path / "spec.csv"
+    context, profile, plan = _scan_and_plan(dataset_path=dataset_path, dataset_id="dataset_spec", user_goal="对比门店销售")
+    draft = plan.transform_drafts[0]
+    assert draft.spec is not None
+    assert draft.spec.kind == "groupby_sum"
+    code_only_plan = plan.model_copy(
+        update={"transform_drafts": [draft.model_copy(update={"spec": None})]},
+    )
+    transformer = TransformExecutionAgent()
+    outputs = [
+        transformer.run(
+            context=context,
+            payload=TransformPayload(
+                dataset_profile=profile,
+                plan=candidate,
+                dataset_path=dataset_path,
+                sample_limit=3,
+            ),
+        ).output.output_table
+        for candidate in (plan, code_only_plan)
+    ]
+    assert outputs[0].preview == outputs[1].preview
+    assert outputs[0].schema == outputs[1].schema
+
+
+def test_transform_groupby_orders_tied_sums_by_group_key(tmp_path: Path) -> None:
+    """指标并列的分组按分组键升序排列，不随分组在数据中首次出现的顺序变化。"""
+
+    dataset_path = tmp_path / "tied.csv"
+    dataset_path.write_text(
+        "store,sales,date\nC,10,2024-01-01\nB,5,2024-01-02\nA,10,2024-01-03\n",
+        encoding="utf-8",
+    )
+    context, profile = _scan_file(dataset_path=dataset_path, dataset_id="dataset_tied")
+    plan = PlanRefinementAgent().run(
+        context=context,
+        payload=PlanPayload(dataset_profile=profile, user_goal="对比门店销售"),
+    ).output
+    draft = plan.transform_drafts[0]
+    assert draft.spec is not None and draft.spec.kind == "groupby_sum"
+    code_only_plan = plan.model_copy(
+        update={"transform_drafts": [draft.model_copy(update={"spec": None})]},
+    )
+    for candidate in (plan, code_only_plan):
+        output_table = TransformExecutionAgent().run(
+            context=context,
+            payload=TransformPayload(
+                dataset_profile=profile,
+                plan=candidate,
+                dataset_path=dataset_path,
+                sample_limit=3,
+            ),
+        ).output.output_table
+        assert [row["store"] for row in output_table.preview.rows] == ["A", "C", "B"]
+
+
+def test_transform_execute_runs_edited_code_over_stale_spec(tmp_path: Path) -> None:
+    """客户端改写 code 后，执行端应以 code 为准，而非静默沿用旧的结构化描述。"""
+
+    dataset_path = tmp_path / "edited.csv"
+    _, _, plan = _scan_and_plan(dataset_path=dataset_path, dataset_id="dataset_edited", user_goal="对比门店销售")
+    draft = plan.transform_drafts[0]
+    assert draft.spec is not None and draft.spec.kind == "groupby_sum"
+    edited_code = draft.code.replace("    return grouped", "    return df")
+    plan_payload = json.loads(model_dump_json(plan))
+    plan_payload["transform_drafts"][0]["code"] = edited_code
+    app = create_app()
+    app.dependency_overrides[get_trace_store] = lambda: TraceStore(base_path=tmp_path / "traces")
+    app.dependency_overrides[get_api_recorder] = lambda: ApiRecorder(base_path=tmp_path / "api_logs")
+    client = TestClient(app)
+    response = client.post(
+        "/api/transform/execute",
+        json={
+            "task_id": "task_edited",
+            "dataset_id": "dataset_edited",
+            "dataset_name": "Edited Dataset",
+            "dataset_version": "v1",
+            "dataset_path": str(dataset_path),
+            "sample_limit": 3,
+            "plan": plan_payload,
+        },
+    )
+    app.dependency_overrides.clear()
+    assert response.status_code == 200
+    # 改写后的代码原样返回三行输入，旧描述按门店分组只会得到两行。
+    assert response.json()["output_table"]["metrics"]["rows_out"] == 3
+
+
+def test_transform_ignores_spec_for_non_python_draft(tmp_path: Path) -> None:
+    """非 Python 草案即使代码与渲染结果相同，也不应走结构化描述分派。"""
+
+    dataset_path = tmp_path / "sql.csv"
+    context, profile, plan = _scan_and_plan(dataset_path=dataset_path, dataset_id="dataset_sql", user_goal="对比门店销售")
+    draft = plan.transform_drafts[0].model_copy(update={"language": "sql"})
+    with pytest.raises(ValueError, match="暂不支持语言 sql"):
+        TransformExecutionAgent().run(
+            context=context,
+            payload=TransformPayload(
+                dataset_profile=profile,
+                plan=plan.model_copy(update={"transform_drafts": [draft]}),
+                dataset_path=dataset_path,
+                sample_limit=3,
+            ),
+        )
+
+
+def test_transform_sample_keeps_datetime_time_component(tmp_path: Path) -> None:
+    """仅含零点的 datetime 列样本应保留时间部分，与逐值 str() 的格式一致。"""
+
+    output_table = _execute_transform_code(
+        dataset_path=tmp_path / "datetime.csv",
+        dataset_id="dataset_datetime",
+        code_lines=[
+            "def transform(df):",
+            "    df = df.copy()",
+            "    df['date'] = pd.to_datetime(df['date'])",
+            "    return df",
+        ],
+    )
+    assert output_table.preview.rows[0]["date"] == "2024-01-01 00:00:00"
+    assert output_table.preview.rows[0]["sales"] == "10"
+
+
+def test_transform_sample_renders_numeric_frame_like_iterrows(tmp_path: Path) -> None:
+    """全数值结果按行内公共类型渲染，整数列与 iterrows 一样显示为 10.0。"""
+
+    output_table = _execute_transform_code(
+        dataset_path=tmp_path / "numeric.csv",
+        dataset_id="dataset_numeric",
+        code_lines=[
+            "def transform(df):",
+            "    return df[['sales']].assign(ratio=df['sales'] / 4)",
+        ],
+    )
+    assert output_table.preview.rows[0] == {"sales": "10.0", "ratio": "2.5"}
+
+
 def test_task_runner_streams_events(tmp_path: Path) -> None:
     """TaskRunner 应推送开始、节点完成与结束事件，并生成行数统计。"""
 
@@ -182,6 +499,9 @@ def test_task_result_endpoint_returns_snapshot(tmp_path: Path) -> None:
         assert snapshot.outcome.output_table.metrics.rows_out >= 1
         app = create_app()
         app.dependency_overrides[get_task_runner] = lambda: runner
+        # 结果与流式接口都会落盘请求日志，落到临时目录而非仓库的 var/。
+        app.dependency_overrides[get_trace_store] = lambda: trace_store
+        app.dependency_overrides[get_api_recorder] = lambda: api_recorder
         client = TestClient(app)
         response = client.get(f"/api/task/{task_id}/result")
         assert response.status_code == 200
@@ -191,6 +511,58 @@ def test_task_result_endpoint_returns_snapshot(tmp_path: Path) -> None:
         assert payload["result"]["output_table"]["metrics"]["rows_out"] >= 1
         assert payload["result"]["encoding_patch"]["target_chart_id"] == payload["result"]["chart"]["chart_id"]
         assert payload["result"]["trace"]["task_id"] == task_id
+        stream = client.get("/api/task/stream", params={"task_id": task_id})
+        first_frame = stream.text.split("\n\n", 1)[0]
+        assert first_frame == f'event: snapshot\ndata: {{"task_id":"{task_id}","status":"completed"}}'
         app.dependency_overrides.clear()
 
     asyncio.run(_run())
+
+
+def test_scan_endpoint_rejects_unusable_paths(tmp_path: Path) -> None:
+    """不存在、含 NUL 字节或符号链接循环的路径均应返回 400，而非 500。"""
+
+    loop_path = tmp_path / "loop"
+    loop_path.symlink_to(loop_path)
+    app = create_app()
+    app.dependency_overrides[get_trace_store] = lambda: TraceStore(base_path=tmp_path / "traces")
+    app.dependency_overrides[get_api_recorder] = lambda: ApiRecorder(base_path=tmp_path / "api_logs")
+    client = TestClient(app)
+    for path_str in (str(tmp_path / "missing.csv"), "bad\x00path.csv", str(loop_path)):
+        response = client.post(
+            "/api/data/scan",
+            json={
+                "task_id": "task_bad_path",
+                "dataset_id": "dataset_bad_path",
+                "dataset_name": "Bad Path Dataset",
+                "dataset_version": "v1",
+                "dataset_path": path_str,
+            },
+        )
+        assert response.status_code == 400
+    app.dependency_overrides.clear()
+
+
+def test_scan_endpoint_maps_dataset_deleted_after_check_to_400(tmp_path: Path) -> None:
+    """路径校验缓存命中后文件被删除，应返回与校验失败相同的 400，且下次请求重新校验。"""
+
+    dataset_path = tmp_path / "vanishing.csv"
+    _create_sample_dataset(path=dataset_path)
+    app = create_app()
+    app.dependency_overrides[get_trace_store] = lambda: TraceStore(base_path=tmp_path / "traces")
+    app.dependency_overrides[get_api_recorder] = lambda: ApiRecorder(base_path=tmp_path / "api_logs")
+    client = TestClient(app)
+    payload = {
+        "task_id": "task_vanishing",
+        "dataset_id": "dataset_vanishing",
+        "dataset_name": "Vanishing Dataset",
+        "dataset_version": "v1",
+        "dataset_path": str(dataset_path),
+    }
+    assert client.post("/api/data/scan", json=payload).status_code == 200
+    dataset_path.unlink()
+    response = client.post("/api/data/scan", json=payload)
+    app.dependency_overrides.clear()
+    assert response.status_code == 400
+    assert response.json()["detail"] == f"数据源路径不存在: {dataset_path}"
+    assert routes._checked_path.cache_info().currsize == 0
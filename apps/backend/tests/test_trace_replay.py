@@ -2,11 +2,22 @@
 
 from __future__ import annotations
 
+import json
 from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
 
 from apps.backend.api import routes
+from apps.backend.api.app import create_app
+from apps.backend.api.dependencies import get_api_recorder, get_trace_store
+from apps.backend.compat import model_dump
 from apps.backend.contracts.trace import SpanEvent, SpanMetrics, SpanSLO, TraceRecord, TraceSpan
 from apps.backend.infra.clock import UtcClock
+from apps.backend.infra.persistence import ApiRecorder, QueuedApiRecorder
+from apps.backend.stores import TraceStore
+from apps.backend.stores import trace_store as trace_store_module
 
 
 def _build_trace_record() -> TraceRecord:
@@ -84,3 +95,137 @@ def test_rebuild_trace_record_generates_new_ids() -> None:
     rebuilt_ids = {span.span_id for span in rebuilt.spans}
     assert original_ids.isdisjoint(rebuilt_ids)
     assert [span.operation for span in rebuilt.spans] == [span.operation for span in original.spans]
+
+
+def test_trace_store_json_cache_tracks_saved_trace(tmp_path: Path) -> None:
+    """缓存的 Trace JSON 应与模型序列化一致，重新保存后失效。"""
+
+    store = TraceStore(base_path=tmp_path)
+    original = _build_trace_record()
+    store.save(trace=original)
+    assert json.loads(store.dump_json(trace=store.require(task_id="task-1"))) == model_dump(original)
+    rebuilt = routes._rebuild_trace_record(original=original, clock=UtcClock())
+    store.save(trace=rebuilt)
+    assert json.loads(store.dump_json(trace=store.require(task_id="task-1")))["trace_id"] == rebuilt.trace_id
+
+
+def test_trace_store_json_cache_ignores_stale_encoding(tmp_path: Path) -> None:
+    """编码旧 Trace 期间发生 save 时，旧编码不应被新 Trace 命中。"""
+
+    store = TraceStore(base_path=tmp_path)
+    original = _build_trace_record()
+    store.save(trace=original)
+    rebuilt = routes._rebuild_trace_record(original=original, clock=UtcClock())
+    store.save(trace=rebuilt)
+    # 模拟并发：读取线程在 save 之后才写入旧 Trace 的编码。
+    store.dump_json(trace=original)
+    assert json.loads(store.dump_json(trace=store.require(task_id="task-1")))["trace_id"] == rebuilt.trace_id
+
+
+def test_trace_store_json_cache_is_bounded(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """JSON 编码缓存按最近使用淘汰，条目数不超过上限。"""
+
+    monkeypatch.setattr(trace_store_module, "_JSON_CACHE_MAXSIZE", 2)
+    store = TraceStore(base_path=tmp_path)
+    traces = [_build_trace_record().model_copy(update={"task_id": f"task-{index}"}) for index in range(3)]
+    for trace in traces:
+        store.save(trace=trace)
+    store.dump_json(trace=traces[0])
+    store.dump_json(trace=traces[1])
+    store.dump_json(trace=traces[0])
+    store.dump_json(trace=traces[2])
+    assert list(store._json_cache) == ["task-0", "task-2"]
+
+
+def test_get_trace_honors_if_none_match(tmp_path: Path) -> None:
+    """携带当前 ETag 的条件请求应返回 304，Trace 更新后恢复 200。"""
+
+    store = TraceStore(base_path=tmp_path / "traces")
+    store.save(trace=_build_trace_record())
+    app = create_app()
+    app.dependency_overrides[get_trace_store] = lambda: store
+    app.dependency_overrides[get_api_recorder] = lambda: ApiRecorder(base_path=tmp_path / "api_logs")
+    client = TestClient(app)
+    first = client.get("/api/trace/task-1")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert first.json()["trace_id"] in etag
+    cached = client.get("/api/trace/task-1", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    store.save(trace=routes._rebuild_trace_record(original=store.require(task_id="task-1"), clock=UtcClock()))
+    refreshed = client.get("/api/trace/task-1", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.headers["ETag"] != etag
+    assert refreshed.json()["trace_id"] in refreshed.headers["ETag"]
+    app.dependency_overrides.clear()
+
+
+def test_missing_trace_keeps_key_error_contract(tmp_path: Path) -> None:
+    """Trace 缺失时 404 detail 与落盘的 error_type 仍与 require 抛出的 KeyError 一致。"""
+
+    app = create_app()
+    app.dependency_overrides[get_trace_store] = lambda: TraceStore(base_path=tmp_path / "traces")
+    app.dependency_overrides[get_api_recorder] = lambda: ApiRecorder(base_path=tmp_path / "api_logs")
+    client = TestClient(app)
+    response = client.get("/api/trace/missing")
+    app.dependency_overrides.clear()
+    assert response.status_code == 404
+    assert response.json()["detail"] == str(KeyError("task_id=missing 未找到 Trace 记录。"))
+    error_logs = list((tmp_path / "api_logs").rglob("*_error.json"))
+    assert len(error_logs) == 1
+    assert json.loads(error_logs[0].read_text(encoding="utf-8"))["error_type"] == "KeyError"
+
+
+def test_lifespan_flushes_overridden_instances(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """应用关闭时应 flush 请求实际解析到的覆盖实例，而非另行构造默认实例。"""
+
+    store = TraceStore(base_path=tmp_path / "traces", write_behind=True)
+    store.save(trace=_build_trace_record())
+    recorder = QueuedApiRecorder(base_path=tmp_path / "api_logs")
+    app = create_app()
+    app.dependency_overrides[get_trace_store] = lambda: store
+    app.dependency_overrides[get_api_recorder] = lambda: recorder
+    flushed = []
+    monkeypatch.setattr(store, "flush", lambda: flushed.append("trace_store"))
+    monkeypatch.setattr(recorder, "flush", lambda: flushed.append("api_recorder"))
+    with TestClient(app) as client:
+        assert client.get("/api/trace/task-1").status_code == 200
+    assert sorted(flushed) == ["api_recorder", "trace_store"]
+    store.close()
+    recorder.close()
+
+
+def test_trace_store_write_behind_is_readable_before_flush(tmp_path: Path) -> None:
+    """write_behind 模式下保存后立即可读，flush 后文件落盘。"""
+
+    store = TraceStore(base_path=tmp_path, write_behind=True)
+    trace = _build_trace_record()
+    store.save(trace=trace)
+    assert store.require(task_id="task-1") is trace
+    store.flush()
+    reloaded = TraceStore(base_path=tmp_path)
+    assert reloaded.require(task_id="task-1").trace_id == trace.trace_id
+    store.close()
+
+
+def test_trace_store_write_behind_persists_last_save(tmp_path: Path) -> None:
+    """write_behind 模式下同一 task_id 多次保存，落盘内容以最后一次保存的 Trace 为准。"""
+
+    store = TraceStore(base_path=tmp_path, write_behind=True)
+    original = _build_trace_record()
+    store.save(trace=original)
+    rebuilt = routes._rebuild_trace_record(original=original, clock=UtcClock())
+    store.save(trace=rebuilt)
+    store.close()
+    assert TraceStore(base_path=tmp_path).require(task_id="task-1").trace_id == rebuilt.trace_id
+
+
+def test_trace_store_get_returns_none_for_missing_task(tmp_path: Path) -> None:
+    """get 未命中返回 None，require 仍以 KeyError 快速失败。"""
+
+    store = TraceStore(base_path=tmp_path)
+    assert store.get(task_id="missing") is None
+    store.save(trace=_build_trace_record())
+    assert TraceStore(base_path=tmp_path).get(task_id="task-1").trace_id == "trace-1"
+    with pytest.raises(KeyError):
+        store.require(task_id="missing")